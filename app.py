@@ -1,21 +1,46 @@
-from flask import Flask, render_template, request, jsonify, send_file, session, redirect, url_for
+from flask import Flask, render_template, request, jsonify, send_file, send_from_directory, session, redirect, url_for, has_request_context, Response, stream_with_context
 from werkzeug.utils import secure_filename
+from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.security import generate_password_hash, check_password_hash
 import os
+import io
+import csv
+import sys
 import json
+import click
 import uuid
-from datetime import datetime, date
+import gzip
+import zlib
+import math
+import mimetypes
+import threading
+import time
+from datetime import datetime, date, timedelta, timezone
 from functools import wraps
-from pymongo import MongoClient
-from bson import ObjectId
+from concurrent.futures import ThreadPoolExecutor
+from images import IMAGE_SUPPORT, WEBP_SUPPORT, IMAGE_CONTENT_TYPES, is_image, make_variants, recompress, content_type_of
+from storage import MongoStorage, SQLiteStorage, MISSING, strip_file_data
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import redis
+except ImportError:
+    redis = None
 
 app = Flask(__name__)
 
 # Get environment variables with error checking
+STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "mongo")  # 'mongo' or 'sqlite'
 MONGO_URI = os.environ.get("MONGO_URI")
 SECRET_KEY = os.environ.get("SECRET_KEY")
 
-if not MONGO_URI:
+if STORAGE_BACKEND not in ('mongo', 'sqlite'):
+    raise ValueError("STORAGE_BACKEND must be 'mongo' or 'sqlite'")
+if STORAGE_BACKEND == 'mongo' and not MONGO_URI:
     raise ValueError("MONGO_URI environment variable is not set")
 if not SECRET_KEY:
     raise ValueError("SECRET_KEY environment variable is not set")
@@ -30,40 +55,110 @@ app.config['SESSION_COOKIE_HTTPONLY'] = True
 app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
 app.config['PERMANENT_SESSION_LIFETIME'] = 3600  # 1 hour
 
-# MongoDB lazy connection for Vercel serverless
-_client = None
-_db = None
+# Embedded SQLite database file, used when STORAGE_BACKEND=sqlite
+app.config['SQLITE_PATH'] = os.environ.get('SQLITE_PATH', 'workx.db')
+
+# Task lifecycle / retention configuration
+app.config['TASK_ARCHIVE_AFTER_DAYS'] = int(os.environ.get('TASK_ARCHIVE_AFTER_DAYS', 30))
+app.config['TASK_ARCHIVE_BATCH_SIZE'] = int(os.environ.get('TASK_ARCHIVE_BATCH_SIZE', 500))
+app.config['UPLOAD_PAYLOAD_TTL_DAYS'] = int(os.environ.get('UPLOAD_PAYLOAD_TTL_DAYS', 30))
+ARCHIVABLE_STATUSES = ['Completed', 'Delivered']
+
+# Image uploads: previews are generated on background threads (needs Pillow)
+app.config['IMAGE_PREVIEW_SIZES'] = {'thumb': 320, 'preview': 1280}  # longest side in pixels
+app.config['IMAGE_PREVIEW_QUALITY'] = 75
+app.config['IMAGE_WORKERS'] = int(os.environ.get('IMAGE_WORKERS', 2))
+app.config['IMAGE_RECOMPRESS_ORIGINALS'] = os.environ.get('IMAGE_RECOMPRESS_ORIGINALS', 'false').lower() == 'true'
+app.config['IMAGE_ORIGINAL_MAX_SIDE'] = 3000
+app.config['IMAGE_ORIGINAL_MAX_BYTES'] = 1536 * 1024  # quality budget for recompressed JPEGs
+app.config['IMAGE_ORIGINAL_MIN_QUALITY'] = 70
+
+# Static assets built by build_assets.py and response compression
+app.config['ASSET_MANIFEST'] = os.path.join(app.static_folder, 'dist', 'manifest.json')
+# Deploys must run build_assets.py first; refuse to start without the manifest (default on for Vercel)
+app.config['REQUIRE_ASSET_BUILD'] = os.environ.get('REQUIRE_ASSET_BUILD', 'true' if os.environ.get('VERCEL') else 'false').lower() == 'true'
+app.config['COMPRESS_MIN_SIZE'] = 500  # bytes
+app.config['COMPRESS_LEVEL'] = 6
+COMPRESSIBLE_MIMETYPES = {'application/json', 'text/html', 'text/css', 'application/javascript', 'text/javascript'}
+
+# Admission control: per client/route token buckets and in-flight caps for expensive endpoints
+app.config['RATE_LIMIT_ENABLED'] = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+# Number of proxies in front of the app (Vercel/Heroku router = 1), so rate limits key on the
+# real client address from X-Forwarded-For rather than the proxy's; 0 trusts no forwarded headers
+app.config['TRUSTED_PROXY_COUNT'] = int(os.environ.get('TRUSTED_PROXY_COUNT', 1 if os.environ.get('VERCEL') else 0))
+if app.config['TRUSTED_PROXY_COUNT']:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXY_COUNT'], x_proto=app.config['TRUSTED_PROXY_COUNT'])
+app.config['RATE_LIMIT_REDIS_URL'] = os.environ.get('RATE_LIMIT_REDIS_URL')  # shared across workers if set
+app.config['ADMISSION_QUEUE_TIMEOUT'] = 0.1  # seconds to wait for a free slot before shedding
+RATE_LIMITS = {
+    'login': {'per_minute': 10, 'burst': 5},
+    'signup': {'per_minute': 5, 'burst': 3},
+    'create_task': {'per_minute': 6, 'burst': 3},
+    'admin_tasks': {'per_minute': 30, 'burst': 10},
+    'export': {'per_minute': 6, 'burst': 2}
+}
+CONCURRENCY_LIMITS = {
+    'auth': int(os.environ.get('MAX_CONCURRENT_AUTH', 4)),  # password hashing
+    'upload': int(os.environ.get('MAX_CONCURRENT_UPLOADS', 4)),  # up to 16MB each
+    'heavy_query': int(os.environ.get('MAX_CONCURRENT_HEAVY_QUERIES', 2))  # full collection scans
+}
+
+# Read routing: latency-tolerant reads may go to replica set secondaries
+app.config['MONGO_MAX_POOL_SIZE'] = int(os.environ.get('MONGO_MAX_POOL_SIZE', 1))  # per replica set member
+app.config['READ_PREFERENCES'] = {
+    'admin_listing': os.environ.get('READ_PREF_ADMIN_LISTING', 'secondaryPreferred'),
+    'order_history': os.environ.get('READ_PREF_ORDER_HISTORY', 'secondaryPreferred'),
+    'writer_history': os.environ.get('READ_PREF_WRITER_HISTORY', 'secondaryPreferred'),
+    'available_tasks': os.environ.get('READ_PREF_AVAILABLE_TASKS', 'primary'),
+    'export': os.environ.get('READ_PREF_EXPORT', 'secondaryPreferred')
+}
+app.config['READ_MAX_STALENESS_SECONDS'] = int(os.environ.get('READ_MAX_STALENESS_SECONDS', 90))  # MongoDB minimum is 90
+app.config['READ_YOUR_WRITES_WINDOW'] = 120  # seconds a client reads from the primary after writing
+
+# Storage backend, created lazily for Vercel serverless
+_storage = None
 
-def get_db():
-    """Lazy MongoDB connection - only connects when needed"""
-    global _client, _db
-    if _db is None:
+def get_storage():
+    """Lazy storage backend - only connects when needed"""
+    global _storage
+    if _storage is None:
         try:
-            # Configure connection with minimal SSL for Vercel
-            connection_uri = MONGO_URI
-            if '?' in connection_uri:
-                connection_uri += '&tls=true&tlsAllowInvalidCertificates=true'
+            if STORAGE_BACKEND == 'sqlite':
+                _storage = SQLiteStorage(app.config['SQLITE_PATH'])
+                print(f"SQLite database opened: {app.config['SQLITE_PATH']}")
             else:
-                connection_uri += '?tls=true&tlsAllowInvalidCertificates=true'
-            
-            _client = MongoClient(
-                connection_uri,
-                serverSelectionTimeoutMS=5000,
-                connectTimeoutMS=5000,
-                socketTimeoutMS=5000,
-                maxPoolSize=1,
-                minPoolSize=0
-            )
-            _db = _client.get_database()
-            _client.admin.command('ping')
-            print("MongoDB connected successfully")
+                # Configure connection with minimal SSL for Vercel
+                connection_uri = MONGO_URI
+                if '?' in connection_uri:
+                    connection_uri += '&tls=true&tlsAllowInvalidCertificates=true'
+                else:
+                    connection_uri += '?tls=true&tlsAllowInvalidCertificates=true'
+                
+                _storage = MongoStorage(
+                    connection_uri,
+                    max_pool_size=app.config['MONGO_MAX_POOL_SIZE'],
+                    read_preferences=app.config['READ_PREFERENCES'],
+                    max_staleness=app.config['READ_MAX_STALENESS_SECONDS']
+                )
+                print("MongoDB connected successfully")
         except Exception as e:
-            print(f"MongoDB connection error: {e}")
+            print(f"Storage connection error: {e}")
             raise
-    return _db
+    return _storage
+
+def read_profile_for(read_profile):
+    """read_profile, or None (primary) if this client wrote recently and must see its own writes"""
+    if read_profile and has_request_context():
+        last_write_at = session.get('last_write_at')
+        if last_write_at and time.time() - last_write_at < app.config['READ_YOUR_WRITES_WINDOW']:
+            return None
+    return read_profile
+
+def note_recent_write():
+    """Route this client's latency-tolerant reads to the primary for a short while"""
+    if has_request_context():
+        session['last_write_at'] = time.time()
 
-# Initialize db reference (will be lazy loaded)
-db = None
 # Official rate card (display only - admin sets actual price)
 RATE_CARD = {
     'Blue Book': {'base': 15, 'fee': 2, 'unit': 'page'},
@@ -75,85 +170,383 @@ RATE_CARD = {
     'Report': {'base': 100, 'fee': 12, 'unit': 'doc'}
 }
 
+def load_asset_manifest():
+    """Load the fingerprinted asset manifest, empty if assets have not been built"""
+    try:
+        with open(app.config['ASSET_MANIFEST']) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+ASSET_MANIFEST = load_asset_manifest()
+if app.config['REQUIRE_ASSET_BUILD'] and not ASSET_MANIFEST:
+    raise RuntimeError("static/dist/manifest.json is missing - run python build_assets.py before starting the app")
+
 # Helper functions
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_EXTENSIONS']
 
-# MongoDB Database Helper Functions
-def fetch_all_tasks():
+# Database Helper Functions
+def fetch_all_tasks(include_archived=False):
     """Get all tasks from database"""
-    db = get_db()
-    tasks = list(db.tasks.find().sort('created_at', -1))
-    # Convert ObjectId to string for JSON serialization
-    for task in tasks:
-        if '_id' in task:
-            task['_id'] = str(task['_id'])
-    return tasks
-
-def get_task_by_id(task_id):
-    """Get single task by ID"""
-    db = get_db()
-    task = db.tasks.find_one({'task_id': task_id})
-    if task and '_id' in task:
-        task['_id'] = str(task['_id'])
-    return task
+    return find_tasks({}, include_archived=include_archived, read_profile='admin_listing')
+
+def get_task_by_id(task_id, include_archived=True):
+    """Get single task by ID from the primary, falling back to archived tasks"""
+    return get_storage().get_task(task_id, include_archived=include_archived)
+
+def find_tasks(query, include_archived=False, read_profile=None):
+    """Get tasks matching query (newest first), optionally including archived tasks"""
+    return get_storage().find_tasks(query, include_archived=include_archived, read_profile=read_profile_for(read_profile))
+
+def payload_expiry(deadline=None):
+    """When upload payloads of an open task expire: UPLOAD_PAYLOAD_TTL_DAYS after now or after its deadline, whichever is later"""
+    start = datetime.now(timezone.utc)
+    try:
+        # Deadlines are local "YYYY-MM-DD HH:MM" strings
+        deadline_at = datetime.fromisoformat(deadline).astimezone(timezone.utc) if deadline else None
+    except ValueError:
+        deadline_at = None
+    if deadline_at and deadline_at > start:
+        start = deadline_at
+    return start + timedelta(days=app.config['UPLOAD_PAYLOAD_TTL_DAYS'])
+
+def save_task_files(task_id, uploaded_files, deadline=None):
+    """Store upload payloads separately from the task (expired after a TTL), return file metadata for the task"""
+    now = datetime.now(timezone.utc)
+    expires_at = payload_expiry(deadline)
+    file_docs = []
+    for index, file_info in enumerate(uploaded_files):
+        file_docs.append({
+            'task_id': task_id,
+            'index': index,
+            'filename': file_info['filename'],
+            'content_type': file_info['content_type'],
+            'data': file_info['data'],
+            'created_at': now,
+            'expires_at': expires_at
+        })
+    get_storage().save_task_files(task_id, file_docs)
+    return strip_file_data(uploaded_files)
+
+def extend_task_files(task):
+    """Push back payload expiry of a task that is being worked on, so only abandoned orders lose their files"""
+    get_storage().extend_task_files(task['task_id'], payload_expiry(task.get('deadline')))
+
+def removed_file_response(task):
+    """410 for an upload whose payload is gone, saying why"""
+    if task.get('status') in ARCHIVABLE_STATUSES:
+        return jsonify({'error': 'File data has been removed after task completion'}), 410
+    return jsonify({'error': 'File data has expired because the order was inactive'}), 410
+
+def get_task_file_data(task_id, file_index):
+    """Get base64 payload of an uploaded file, None if it has expired or been removed"""
+    return get_storage().get_task_file_data(task_id, file_index)
+
+def delete_task_files(task_ids):
+    """Remove upload payloads of the given tasks"""
+    get_storage().delete_task_files(task_ids)
+
+def archive_completed_tasks(older_than_days=None, batch_size=None):
+    """Move Completed/Delivered tasks older than N days to the archive in batches"""
+    if older_than_days is None:
+        older_than_days = app.config['TASK_ARCHIVE_AFTER_DAYS']
+    if batch_size is None:
+        batch_size = app.config['TASK_ARCHIVE_BATCH_SIZE']
+
+    cutoff = (datetime.now() - timedelta(days=older_than_days)).isoformat()
+    return get_storage().archive_tasks(ARCHIVABLE_STATUSES, cutoff, batch_size)
+
+# Image previews
+IMAGE_FAILED_VARIANT = 'failed'  # stored instead of previews when an upload can't be decoded
+_image_executor = None
+_image_jobs = set()
+_image_jobs_lock = threading.Lock()
+
+def process_task_image(task_id, file_index):
+    """Optionally recompress an uploaded image, then store its previews; False if the payload is gone"""
+    import base64
+    
+    storage = get_storage()
+    encoded_data = storage.get_task_file_data(task_id, file_index)
+    if encoded_data is None:
+        return False
+    data = base64.b64decode(encoded_data)
+    
+    if app.config['IMAGE_RECOMPRESS_ORIGINALS']:
+        smaller = recompress(
+            data,
+            app.config['IMAGE_ORIGINAL_MAX_SIDE'],
+            app.config['IMAGE_ORIGINAL_MAX_BYTES'],
+            app.config['IMAGE_ORIGINAL_MIN_QUALITY']
+        )
+        # The stored content type is served as-is, so never swap in bytes of another format
+        task = storage.get_task(task_id)
+        files = (task or {}).get('user_uploaded_files') or []
+        expected = files[file_index].get('content_type') if file_index < len(files) else None
+        if smaller is not None and content_type_of(smaller) != expected:
+            print(f"Skipped recompressing {task_id}/{file_index}: output is {content_type_of(smaller)}, stored as {expected}")
+        elif smaller is not None:
+            storage.replace_task_file_data(task_id, file_index, base64.b64encode(smaller).decode('utf-8'))
+            print(f"Recompressed {task_id}/{file_index}: {len(data)} -> {len(smaller)} bytes")
+            data = smaller
+    
+    variants = make_variants(data, app.config['IMAGE_PREVIEW_SIZES'], app.config['IMAGE_PREVIEW_QUALITY'])
+    storage.save_task_file_variants(task_id, file_index, variants)
+    return True
+
+def record_image_failure(task_id, file_index, error):
+    """Remember that an upload can't be decoded, so it isn't queued again on every preview request"""
+    print(f"Image processing error for {task_id}/{file_index}: {error}")
+    get_storage().save_task_file_variants(task_id, file_index, {IMAGE_FAILED_VARIANT: str(error).encode('utf-8')})
+
+def run_image_job(task_id, file_index):
+    try:
+        process_task_image(task_id, file_index)
+    except Exception as e:
+        record_image_failure(task_id, file_index, e)
+    finally:
+        with _image_jobs_lock:
+            _image_jobs.discard((task_id, file_index))
+
+def schedule_image_processing(task_id, file_index):
+    """Queue preview generation on the background pool, return False if Pillow is not installed"""
+    global _image_executor
+    if not IMAGE_SUPPORT:
+        return False
+    with _image_jobs_lock:
+        if (task_id, file_index) in _image_jobs:
+            return True
+        _image_jobs.add((task_id, file_index))
+        if _image_executor is None:
+            _image_executor = ThreadPoolExecutor(max_workers=app.config['IMAGE_WORKERS'], thread_name_prefix='images')
+    _image_executor.submit(run_image_job, task_id, file_index)
+    return True
+
+# Writer earnings ledger
+def post_ledger_entry(writer_id, entry_type, amount, task_ids, changes, entry_id=None):
+    """Append a ledger entry and apply the same changes to the writer's counters"""
+    storage = get_storage()
+    entry = {
+        'entry_id': entry_id or str(uuid.uuid4()),
+        'writer_id': writer_id,
+        'type': entry_type,  # earning, adjustment, earning_reversal, payout, payout_reversal, reconciliation
+        'amount': amount,
+        'task_ids': task_ids,
+        'changes': changes,
+        'created_at': datetime.now().isoformat()
+    }
+    storage.insert_ledger_entry(entry)
+    if changes:
+        storage.inc_writer_counters(writer_id, changes)
+    return entry
+
+def record_task_earning(task_id, previous=None):
+    """Keep the writer ledger in step with a task after it changes
+
+    Credits the writer once when the task is Completed/Delivered and adjusts
+    if the payout changes. If the task leaves those statuses, or is moved to
+    another writer, the credit is reversed on the writer who got it. A payout
+    already made stays with the writer who was paid (who then owes it back)
+    and the task stays paid; only an explicit writer_paid=false reverses it.
+    previous is the task as it was before the change. It is only needed for
+    tasks stamped before ledger_writer_id existed.
+    """
+    storage = get_storage()
+    task = storage.get_task(task_id)
+    if not task:
+        return None
+    
+    writer_id = task.get('writer_id')
+    earned = bool(writer_id) and task.get('status') in ARCHIVABLE_STATUSES
+    # ledger_earning/ledger_writer_id on the task record what was credited to whom and guard against double counting
+    credited = task.get('ledger_earning')
+    credited_writer_id = task.get('ledger_writer_id') or (previous or task).get('writer_id')
+    entry = None
+    
+    if credited is not None and (not earned or credited_writer_id != writer_id):
+        if not storage.compare_and_set_task(task_id, {'ledger_earning': credited}, unset=('ledger_earning', 'ledger_writer_id')):
+            return None
+        if credited_writer_id:
+            entry = post_ledger_entry(credited_writer_id, 'earning_reversal', -credited, [task_id],
+                                      {'completed_tasks': -1, 'earnings': -credited})
+        credited = None
+    
+    if not earned:
+        return entry
+    amount = float(task.get('worker_payout') or 0)
+    if credited is None:
+        if storage.compare_and_set_task(task_id, {'ledger_earning': MISSING},
+                                        {'ledger_earning': amount, 'ledger_writer_id': writer_id}):
+            return post_ledger_entry(writer_id, 'earning', amount, [task_id], {'completed_tasks': 1, 'earnings': amount})
+    elif credited != amount:
+        if storage.compare_and_set_task(task_id, {'ledger_earning': credited},
+                                        {'ledger_earning': amount, 'ledger_writer_id': writer_id}):
+            return post_ledger_entry(writer_id, 'adjustment', amount - credited, [task_id], {'earnings': amount - credited})
+    return entry
+
+def settle_writer_payouts(writer_id, task_ids=None):
+    """Mark a writer's unpaid tasks as paid in one bulk update and post a single payout entry
+
+    Without task_ids all of the writer's Completed/Delivered tasks are settled.
+    """
+    batch_id = str(uuid.uuid4())
+    settled = get_storage().settle_writer_tasks(
+        writer_id, task_ids, ARCHIVABLE_STATUSES, batch_id, datetime.now().isoformat()
+    )
+    if not settled:
+        return None
+    settled_ids = [settled_id for settled_id, _ in settled]
+    total = float(sum(amount for _, amount in settled))
+    return post_ledger_entry(writer_id, 'payout', total, settled_ids, {'paid_out': total}, entry_id=batch_id)
+
+def reverse_task_payout(task_id, previous=None):
+    """Undo the payout of a single task, debiting the writer who was paid"""
+    storage = get_storage()
+    task = storage.get_task(task_id)
+    if not task or task.get('writer_paid') is not True:
+        return None
+    
+    reversed_payout = storage.compare_and_set_task(
+        task_id, {'writer_paid': True}, {'writer_paid': False},
+        unset=('ledger_payout', 'ledger_payout_writer_id', 'payout_batch_id', 'paid_at')
+    )
+    # Tasks paid before the ledger existed were never counted, so there is nothing to reverse
+    amount = task.get('ledger_payout')
+    paid_writer_id = task.get('ledger_payout_writer_id') or (previous or task).get('writer_id')
+    if reversed_payout and amount is not None and paid_writer_id:
+        return post_ledger_entry(paid_writer_id, 'payout_reversal', -amount, [task_id], {'paid_out': -amount})
+    return None
+
+def reconcile_writer_ledger(fix=False):
+    """Compare writer counters with their tasks, return mismatches
+
+    With fix, tasks completed or paid before the ledger existed are stamped,
+    and counters are reset to the task totals with a reconciliation entry.
+    """
+    storage = get_storage()
+    if fix:
+        storage.backfill_ledger_stamps(ARCHIVABLE_STATUSES)
+    
+    expected = storage.writer_task_totals(ARCHIVABLE_STATUSES)
+    mismatches = []
+    for writer in storage.iter_writers():
+        writer_expected = expected.get(writer['id'], {'completed_tasks': 0, 'earnings': 0.0, 'paid_out': 0.0})
+        actual = {field: writer.get(field, 0) for field in writer_expected}
+        changes = {field: writer_expected[field] - actual[field] for field in writer_expected
+                   if abs(writer_expected[field] - actual[field]) > 0.005}
+        if not changes:
+            continue
+        mismatches.append({
+            'writer_id': writer['id'],
+            'username': writer['username'],
+            'expected': writer_expected,
+            'actual': actual
+        })
+        if fix:
+            post_ledger_entry(writer['id'], 'reconciliation', changes.get('earnings', 0.0), [], changes)
+    return mismatches
+
+# Task export for accounting
+EXPORT_FIELDS = [
+    'task_id', 'created_at', 'status', 'work_type', 'pages', 'base_price', 'platform_fee',
+    'material_cost', 'same_day_surcharge', 'final_price', 'worker_payout', 'payment_received',
+    'writer_paid', 'user_id', 'writer_id', 'writer_username', 'deadline', 'completed_at', 'paid_at'
+]
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+EXPORT_CHUNK_SIZE = 64 * 1024  # bytes buffered before a chunk is sent
+
+def build_export_query(date_from=None, date_to=None, status=None, writer_id=None, after=None):
+    """Storage filters for an export; dates are YYYY-MM-DD (inclusive), after is a resume token"""
+    query = {}
+    if date_from:
+        query['date_from'] = date.fromisoformat(date_from).isoformat()
+    if date_to:
+        query['date_to'] = (date.fromisoformat(date_to) + timedelta(days=1)).isoformat()
+    if status:
+        query['statuses'] = status.split(',')
+    if writer_id:
+        query['writer_id'] = writer_id
+    if after:
+        # Resume token is "<created_at>|<task_id>" of the last row received
+        after_created_at, _, after_task_id = after.partition('|')
+        query['after'] = (after_created_at, after_task_id)
+    return query
+
+def iter_export_rows(query):
+    """Yield tasks and archived tasks matching query in (created_at, task_id) order without loading them all"""
+    return get_storage().iter_export_rows(query, EXPORT_FIELDS)
+
+def csv_cell(value):
+    """Export cell with user-entered text starting with =, +, - or @ quoted so spreadsheets don't run it as a formula"""
+    if isinstance(value, str) and value.startswith(('=', '+', '-', '@')):
+        return "'" + value
+    return value
+
+def export_tasks(query, export_format='csv', include_header=True):
+    """Yield the export as text chunks of roughly EXPORT_CHUNK_SIZE"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if export_format == 'csv' else None
+    if writer and include_header:
+        writer.writerow(EXPORT_FIELDS)
+    
+    for row in iter_export_rows(query):
+        if writer:
+            writer.writerow([csv_cell(row.get(field)) for field in EXPORT_FIELDS])
+        else:
+            buffer.write(json.dumps({field: row.get(field) for field in EXPORT_FIELDS}, default=str) + '\n')
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def gzip_chunks(chunks):
+    """Gzip a stream of text chunks incrementally, one gzip member per chunk
+
+    Readers treat the members as one stream. Finishing a member per chunk
+    means an interrupted export loses at most its last chunk on --resume.
+    """
+    for chunk in chunks:
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 writes a gzip header
+        yield compressor.compress(chunk.encode('utf-8')) + compressor.flush()
 
 def save_task(task_data):
     """Insert or update task"""
-    db = get_db()
+    storage = get_storage()
     task_id = task_data.get('task_id')
-    existing_task = db.tasks.find_one({'task_id': task_id})
     
-    if existing_task:
-        # Update existing task
-        db.tasks.update_one(
-            {'task_id': task_id},
-            {'$set': task_data}
-        )
-    else:
-        # Insert new task
-        db.tasks.insert_one(task_data)
+    if not storage.update_task(task_id, task_data):
+        storage.insert_task(task_data)
     
     return task_id
 
 def save_user_file(task_id, filename):
-    """Save user uploaded file reference - MongoDB stores files array in task document"""
-    db = get_db()
-    db.tasks.update_one(
-        {'task_id': task_id},
-        {'$push': {'user_uploaded_files': filename}}
-    )
+    """Save user uploaded file reference - the files array is stored in the task document"""
+    task = get_task_by_id(task_id, include_archived=False)
+    if task:
+        get_storage().update_task(task_id, {'user_uploaded_files': task.get('user_uploaded_files', []) + [filename]})
     return True
 
 def get_user_by_username(username):
-    """Get user by username from users collection"""
-    db = get_db()
-    user = db.users.find_one({'username': username})
-    if user and '_id' in user:
-        user['_id'] = str(user['_id'])
-        user['id'] = user.get('id', str(user['_id']))
-    return user
+    """Get user by username"""
+    return get_storage().get_user_by_username(username)
 
 def get_writer_by_username(username):
-    """Get writer by username from writers collection"""
-    db = get_db()
-    writer = db.writers.find_one({'username': username})
-    if writer and '_id' in writer:
-        writer['_id'] = str(writer['_id'])
-        writer['id'] = writer.get('id', str(writer['_id']))
-    return writer
+    """Get writer by username"""
+    return get_storage().get_writer_by_username(username)
 
 def get_admin_by_username(username):
     """Get admin by username"""
-    db = get_db()
-    admin = db.admin.find_one({'username': username})
-    if admin and '_id' in admin:
-        admin['_id'] = str(admin['_id'])
-    return admin
+    return get_storage().get_admin_by_username(username)
 
 def create_user(user_data):
     """Create new user"""
-    db = get_db()
     user_doc = {
         'id': str(uuid.uuid4()),
         'username': user_data['username'],
@@ -162,12 +555,10 @@ def create_user(user_data):
         'phone': user_data.get('phone', ''),
         'created_at': datetime.now().isoformat()
     }
-    result = db.users.insert_one(user_doc)
-    return result.inserted_id
+    return get_storage().create_user(user_doc)
 
 def create_writer(writer_data):
     """Create new writer"""
-    db = get_db()
     writer_doc = {
         'id': str(uuid.uuid4()),
         'username': writer_data['username'],
@@ -176,10 +567,125 @@ def create_writer(writer_data):
         'phone': writer_data.get('phone', ''),
         'created_at': datetime.now().isoformat(),
         'completed_tasks': 0,
-        'earnings': 0.0
+        'earnings': 0.0,
+        'paid_out': 0.0
     }
-    result = db.writers.insert_one(writer_doc)
-    return result.inserted_id
+    return get_storage().create_writer(writer_doc)
+
+# Rate limiting backends
+class MemoryRateLimiter:
+    """Token buckets kept in process memory (one set per worker process)"""
+    MAX_BUCKETS = 10000
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key, rate, burst):
+        """Take one token from the bucket, return seconds to wait (0 if allowed)"""
+        now = time.monotonic()
+        with self._lock:
+            if len(self._buckets) > self.MAX_BUCKETS:
+                self._prune(now)
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / rate
+
+    def _prune(self, now):
+        # Buckets idle for a minute have refilled for every configured limit
+        self._buckets = {key: value for key, value in self._buckets.items() if now - value[1] < 60}
+
+class RedisRateLimiter:
+    """Token buckets shared by all workers through Redis"""
+    SCRIPT = """
+    local data = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local rate = tonumber(ARGV[1])
+    local burst = tonumber(ARGV[2])
+    local now = tonumber(ARGV[3])
+    local tokens = tonumber(data[1]) or burst
+    local updated = tonumber(data[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+    local wait = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        wait = (1 - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return tostring(wait)
+    """
+
+    def __init__(self, url):
+        self._redis = redis.Redis.from_url(url, socket_timeout=0.2)
+        self._script = self._redis.register_script(self.SCRIPT)
+
+    def consume(self, key, rate, burst):
+        """Take one token from the bucket, return seconds to wait (0 if allowed)"""
+        try:
+            return float(self._script(keys=[f'ratelimit:{key}'], args=[rate, burst, time.time()]))
+        except Exception as e:
+            # Fail open - an unavailable limiter must not take the site down
+            print(f"Rate limiter error: {e}")
+            return 0
+
+_rate_limiter = None
+_concurrency_slots = {name: threading.BoundedSemaphore(limit) for name, limit in CONCURRENCY_LIMITS.items()}
+
+def get_rate_limiter():
+    """Lazy rate limiter - Redis when configured, in-memory otherwise"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        redis_url = app.config['RATE_LIMIT_REDIS_URL']
+        if redis_url and redis is not None:
+            _rate_limiter = RedisRateLimiter(redis_url)
+        else:
+            if redis_url:
+                print("RATE_LIMIT_REDIS_URL is set but the redis package is not installed, using in-memory rate limits")
+            _rate_limiter = MemoryRateLimiter()
+    return _rate_limiter
+
+def retry_later(error, status_code, retry_after):
+    """Fast rejection response with a Retry-After header"""
+    response = jsonify({'error': error})
+    response.status_code = status_code
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+# Admission control decorators
+def rate_limit(name):
+    """Limit requests per client (session user or IP) to the RATE_LIMITS entry for name"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if app.config['RATE_LIMIT_ENABLED']:
+                limit = RATE_LIMITS[name]
+                client = session.get('user_id') or request.remote_addr
+                wait = get_rate_limiter().consume(f"{name}:{client}", limit['per_minute'] / 60.0, limit['burst'])
+                if wait > 0:
+                    return retry_later('Too many requests, please try again later', 429, wait)
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+def limit_concurrency(name):
+    """Bound in-flight requests sharing the CONCURRENCY_LIMITS slot pool for name"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            slots = _concurrency_slots[name]
+            if not slots.acquire(timeout=app.config['ADMISSION_QUEUE_TIMEOUT']):
+                return retry_later('Server is busy, please try again shortly', 503, 1)
+            try:
+                return f(*args, **kwargs)
+            finally:
+                slots.release()
+        return decorated_function
+    return decorator
 
 # Authentication decorators
 def login_required(f):
@@ -206,6 +712,61 @@ def writer_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# Static assets and response compression
+@app.url_defaults
+def hashed_static_url(endpoint, values):
+    """Make url_for('static', filename=...) emit the fingerprinted file name"""
+    if endpoint == 'static' and values.get('filename') in ASSET_MANIFEST:
+        values['filename'] = ASSET_MANIFEST[values['filename']]
+
+def serve_static(filename):
+    """Serve static files, using precompressed variants and long cache headers for built assets"""
+    if not filename.startswith('dist/'):
+        return app.send_static_file(filename)
+    
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    encoding = None
+    for candidate, extension in (('br', '.br'), ('gzip', '.gz')):
+        if candidate in request.accept_encodings and os.path.isfile(os.path.join(app.static_folder, filename + extension)):
+            encoding = candidate
+            filename += extension
+            break
+    
+    # Fingerprinted names change with their content, so they can be cached forever
+    response = send_from_directory(app.static_folder, filename, mimetype=mimetype, max_age=31536000)
+    response.cache_control.immutable = True
+    response.vary.add('Accept-Encoding')
+    if encoding:
+        response.content_encoding = encoding
+    return response
+
+app.view_functions['static'] = serve_static
+
+@app.after_request
+def compress_response(response):
+    """Compress JSON and HTML responses for clients that accept gzip/brotli"""
+    if (response.direct_passthrough or response.is_streamed
+            or response.status_code < 200 or response.status_code >= 300
+            or response.content_encoding
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+    
+    data = response.get_data()
+    if len(data) < app.config['COMPRESS_MIN_SIZE']:
+        return response
+    
+    if brotli is not None and 'br' in request.accept_encodings:
+        response.set_data(brotli.compress(data, quality=4))
+        response.content_encoding = 'br'
+    elif 'gzip' in request.accept_encodings:
+        response.set_data(gzip.compress(data, compresslevel=app.config['COMPRESS_LEVEL']))
+        response.content_encoding = 'gzip'
+    else:
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    return response
+
 # Routes
 @app.route('/')
 def index():
@@ -221,6 +782,8 @@ def signup_page():
     return render_template('signup.html')
 
 @app.route('/api/signup', methods=['POST'])
+@rate_limit('signup')
+@limit_concurrency('auth')
 def signup():
     try:
         data = request.json
@@ -241,11 +804,7 @@ def signup():
             return jsonify({'error': 'Username already exists'}), 400
         
         # Check email
-        db = get_db()
-        user_email_check = db.users.find_one({'email': email})
-        writer_email_check = db.writers.find_one({'email': email})
-        
-        if user_email_check or writer_email_check:
+        if get_storage().email_exists(email):
             return jsonify({'error': 'Email already exists'}), 400
         
         # Create new user
@@ -269,6 +828,8 @@ def signup():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/login', methods=['POST'])
+@rate_limit('login')
+@limit_concurrency('auth')
 def login():
     try:
         data = request.json
@@ -370,6 +931,8 @@ def user_task_page():
 # API Endpoints
 @app.route('/api/create_task', methods=['POST'])
 @login_required
+@rate_limit('create_task')
+@limit_concurrency('upload')
 def create_task():
     try:
         if session.get('user_role') != 'user':
@@ -402,7 +965,7 @@ def create_task():
             elif work_type in ['Record-Ruled', 'Record-Unruled']:
                 material_cost = 90
         
-        # Handle file upload (REQUIRED) - Store in MongoDB as base64
+        # Handle file upload (REQUIRED) - Store in the database as base64
         import base64
         uploaded_files = []
         if 'files' in request.files:
@@ -440,7 +1003,7 @@ def create_task():
             'worker_payout': None,  # Admin will set
             'user_id': session.get('user_id'),
             'user_contact': user_contact,
-            'user_uploaded_files': uploaded_files,
+            'user_uploaded_files': save_task_files(task_id, uploaded_files, deadline),
             'admin_uploaded_result': None,
             'status': 'Pending',
             'deadline': deadline,
@@ -454,6 +1017,12 @@ def create_task():
         
         # Save task to database
         save_task(task)
+        note_recent_write()
+        
+        # Previews are generated after the response, so large photos don't slow down the upload
+        for index, file_info in enumerate(uploaded_files):
+            if is_image(file_info['filename']):
+                schedule_image_processing(task_id, index)
         
         return jsonify({
             'success': True,
@@ -465,16 +1034,20 @@ def create_task():
 
 @app.route('/api/admin/tasks', methods=['GET'])
 @admin_required
+@rate_limit('admin_tasks')
+@limit_concurrency('heavy_query')
 def get_all_tasks():
     try:
-        tasks = fetch_all_tasks()
+        include_archived = request.args.get('include_archived') == 'true'
+        tasks = fetch_all_tasks(include_archived=include_archived)
         
         # Enrich tasks with full user and writer details
-        db = get_db()
+        storage = get_storage()
+        read_profile = read_profile_for('admin_listing')
         for task in tasks:
             # Add user details
             if task.get('user_id'):
-                user = db.users.find_one({'id': task['user_id']})
+                user = storage.get_user_by_id(task['user_id'], read_profile=read_profile)
                 if user:
                     task['user_details'] = {
                         'username': user['username'],
@@ -484,14 +1057,16 @@ def get_all_tasks():
             
             # Add writer details
             if task.get('writer_id'):
-                writer = db.writers.find_one({'id': task['writer_id']})
+                writer = storage.get_writer_by_id(task['writer_id'], read_profile=read_profile)
                 if writer:
                     task['writer_details'] = {
                         'username': writer['username'],
                         'email': writer['email'],
                         'phone': writer.get('phone', 'N/A'),
                         'completed_tasks': writer.get('completed_tasks', 0),
-                        'earnings': writer.get('earnings', 0)
+                        'earnings': writer.get('earnings', 0),
+                        'paid_out': writer.get('paid_out', 0),
+                        'outstanding': writer.get('earnings', 0) - writer.get('paid_out', 0)
                     }
         
         return jsonify({'tasks': tasks})
@@ -503,20 +1078,8 @@ def get_all_tasks():
 @writer_required
 def get_available_tasks():
     try:
-        db = get_db()
-        tasks = list(db.tasks.find({
-            '$or': [
-                {'writer_id': None},
-                {'writer_id': {'$exists': False}}
-            ],
-            'status': 'Pending'
-        }).sort('created_at', -1))
-        
-        # Convert ObjectId to string
-        for task in tasks:
-            if '_id' in task:
-                task['_id'] = str(task['_id'])
-            # user_uploaded_files already in task document
+        # writer_id None also matches tasks without the field
+        tasks = find_tasks({'writer_id': None, 'status': 'Pending'}, read_profile='available_tasks')
         
         return jsonify({'tasks': tasks})
     except Exception as e:
@@ -542,17 +1105,23 @@ def claim_task():
             else:
                 return jsonify({'error': 'This task has been claimed by another writer'}), 400
         
-        # Update task
-        db = get_db()
-        db.tasks.update_one(
-            {'task_id': task_id},
-            {'$set': {
+        # Claim only if still unassigned, so two writers can't claim the same task
+        claimed = get_storage().compare_and_set_task(
+            task_id,
+            {'writer_id': None},
+            {
                 'writer_id': session.get('user_id'),
                 'writer_username': session.get('username'),
                 'status': 'In Progress',
                 'claimed_at': datetime.now().isoformat()
-            }}
+            }
         )
+        note_recent_write()
+        
+        if not claimed:
+            return jsonify({'error': 'This task has been claimed by another writer'}), 400
+        # The writer needs the reference files until the work is done
+        extend_task_files(task)
         return jsonify({'success': True, 'message': 'Task claimed successfully!'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -562,15 +1131,8 @@ def claim_task():
 @writer_required
 def get_my_tasks():
     try:
-        db = get_db()
         writer_id = session.get('user_id')
-        tasks = list(db.tasks.find({'writer_id': writer_id}).sort('created_at', -1))
-        
-        # Convert ObjectId to string
-        for task in tasks:
-            if '_id' in task:
-                task['_id'] = str(task['_id'])
-            # user_uploaded_files already in task document
+        tasks = find_tasks({'writer_id': writer_id}, include_archived=True, read_profile='writer_history')
         
         return jsonify({'tasks': tasks})
     except Exception as e:
@@ -597,29 +1159,19 @@ def mark_task_complete():
         if task['status'] in ['Completed', 'Delivered']:
             return jsonify({'error': 'Task is already marked as complete'}), 400
         
-        # Delete file data to save space, keep only filenames
-        if 'user_uploaded_files' in task and task['user_uploaded_files']:
-            files_without_data = []
-            for file_info in task['user_uploaded_files']:
-                files_without_data.append({
-                    'filename': file_info.get('filename') if isinstance(file_info, dict) else file_info,
-                    'content_type': file_info.get('content_type') if isinstance(file_info, dict) else None
-                })
-        
-        # Mark as completed and remove file data
+        # Mark as completed and remove file data, keep only filenames
         update_data = {
             'status': 'Completed',
             'completed_at': datetime.now().isoformat()
         }
         
         if 'user_uploaded_files' in task and task['user_uploaded_files']:
-            update_data['user_uploaded_files'] = files_without_data
+            update_data['user_uploaded_files'] = strip_file_data(task['user_uploaded_files'])
         
-        db = get_db()
-        db.tasks.update_one(
-            {'task_id': task_id},
-            {'$set': update_data}
-        )
+        get_storage().update_task(task_id, update_data)
+        delete_task_files([task_id])
+        record_task_earning(task_id)
+        note_recent_write()
         return jsonify({'success': True, 'message': 'Task marked as complete! Admin will review and upload the final work.'})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -632,20 +1184,20 @@ def get_my_orders():
         if session.get('user_role') != 'user':
             return jsonify({'error': 'Unauthorized'}), 403
         
-        db = get_db()
         user_id = session.get('user_id')
-        my_orders = list(db.tasks.find({'user_id': user_id}).sort('created_at', -1))
+        my_orders = find_tasks({'user_id': user_id}, include_archived=True, read_profile='order_history')
         
-        # Convert ObjectId to string
         for order in my_orders:
-            if '_id' in order:
-                order['_id'] = str(order['_id'])
-            # user_uploaded_files already in task document
             if 'user_uploaded_files' not in order:
                 order['user_uploaded_files'] = []
         
         # Make writer information anonymous for users
         for order in my_orders:
+            # Ledger stamps carry the real writer ids and internal payout details
+            for field in [field for field in order if field.startswith('ledger_')]:
+                del order[field]
+            for field in ('payout_batch_id', 'paid_at'):
+                order.pop(field, None)
             if order.get('writer_id'):
                 order['writer_username'] = 'Anonymous Writer'
                 order['writer_id'] = 'ANONYMOUS'
@@ -666,7 +1218,7 @@ def update_task():
         if not task:
             return jsonify({'error': 'Task not found'}), 404
         
-        # Prepare update fields for MongoDB
+        # Prepare update fields
         update_data = {}
         
         # Admin can update all fields including pricing
@@ -686,8 +1238,13 @@ def update_task():
             update_data['worker_payout'] = float(data['worker_payout'])
         if 'payment_received' in data:
             update_data['payment_received'] = data['payment_received'] == 'true'
+        # Writer payouts go through the ledger unless there is no writer to credit
+        writer_paid = None
         if 'writer_paid' in data:
-            update_data['writer_paid'] = data['writer_paid'] == 'true'
+            writer_paid = data['writer_paid'] == 'true'
+            if not update_data.get('writer_id', task.get('writer_id')):
+                update_data['writer_paid'] = writer_paid
+                writer_paid = None
         
         # Handle file upload (admin uploads completed work)
         if 'completed_file' in request.files:
@@ -699,16 +1256,25 @@ def update_task():
                 update_data['admin_uploaded_result'] = unique_filename
                 update_data['status'] = 'Completed'
         
-        # Execute update
-        if update_data:
-            db = get_db()
-            db.tasks.update_one(
-                {'task_id': task_id},
-                {'$set': update_data}
-            )
-        
-        # Fetch updated task
-        task = get_task_by_id(task_id)
+        # Update, ledger and read back in one causal session, so the response reflects the writes
+        with get_storage().causal_session():
+            # Archived tasks are updated in place in the archive
+            if update_data:
+                get_storage().update_task(task_id, update_data)
+            
+            # Keep the writers' ledgers and counters in step with status, assignment, payout and payment
+            record_task_earning(task_id, previous=task)
+            if writer_paid is True:
+                settle_writer_payouts(update_data.get('writer_id', task.get('writer_id')), [task_id])
+            elif writer_paid is False:
+                reverse_task_payout(task_id, previous=task)
+            if update_data or writer_paid is not None:
+                note_recent_write()
+            
+            task = get_task_by_id(task_id)
+        # Any admin change to an open task counts as activity
+        if update_data and task and task.get('status') not in ARCHIVABLE_STATUSES:
+            extend_task_files(task)
         return jsonify({'success': True, 'task': task})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -770,12 +1336,17 @@ def download_user_file(task_id, file_index):
         
         file_info = files[file_index]
         
-        # Check if file data exists (not deleted after completion)
-        if 'data' not in file_info:
-            return jsonify({'error': 'File data has been removed after task completion'}), 410
+        # Older tasks keep the payload inline, newer ones in task_files
+        encoded_data = file_info.get('data') if isinstance(file_info, dict) else None
+        if encoded_data is None:
+            encoded_data = get_task_file_data(task_id, file_index)
+        
+        # Check if file data exists (not deleted after completion or expired)
+        if encoded_data is None:
+            return removed_file_response(task)
         
         # Decode base64 data
-        file_data = base64.b64decode(file_info['data'])
+        file_data = base64.b64decode(encoded_data)
         
         # Create BytesIO object
         file_obj = BytesIO(file_data)
@@ -789,6 +1360,146 @@ def download_user_file(task_id, file_index):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/preview/<task_id>/<int:file_index>', methods=['GET'])
+def preview_user_file(task_id, file_index):
+    """Downscaled WebP/JPEG copy of an uploaded image, ?size=thumb (default) or ?size=preview"""
+    try:
+        size = request.args.get('size', 'thumb')
+        if size not in app.config['IMAGE_PREVIEW_SIZES']:
+            return jsonify({'error': 'Size must be one of: ' + ', '.join(app.config['IMAGE_PREVIEW_SIZES'])}), 400
+        
+        task = get_task_by_id(task_id)
+        
+        if not task or 'user_uploaded_files' not in task:
+            return jsonify({'error': 'Task or files not found'}), 404
+        
+        files = task['user_uploaded_files']
+        
+        if file_index >= len(files):
+            return jsonify({'error': 'File not found'}), 404
+        
+        # Same people who see the task: its user, admins, and writers it is assigned or available to
+        role = session.get('user_role')
+        if role is None:
+            return jsonify({'error': 'Login required'}), 401
+        if not (role == 'admin'
+                or (role == 'user' and task.get('user_id') == session.get('user_id'))
+                or (role == 'writer' and task.get('writer_id') in (None, session.get('user_id')))):
+            return jsonify({'error': 'Unauthorized'}), 403
+        
+        filename = files[file_index]['filename'] if isinstance(files[file_index], dict) else files[file_index]
+        if not is_image(filename):
+            return jsonify({'error': 'Previews are only available for images'}), 404
+        
+        # Serve WebP to browsers that accept it, JPEG otherwise
+        image_format = 'webp' if WEBP_SUPPORT and request.accept_mimetypes['image/webp'] else 'jpeg'
+        data = get_storage().get_task_file_variant(task_id, file_index, f'{size}_{image_format}')
+        
+        if data is None:
+            storage = get_storage()
+            if not storage.has_task_file_data(task_id, file_index):
+                return removed_file_response(task)
+            if storage.get_task_file_variant(task_id, file_index, IMAGE_FAILED_VARIANT) is not None:
+                return jsonify({'error': 'No preview is available for this image'}), 422
+            # Not generated yet (still queued, or uploaded before previews existed)
+            if not schedule_image_processing(task_id, file_index):
+                return jsonify({'error': 'Image previews are not enabled on this server'}), 404
+            return retry_later('Preview is being generated', 202, 2)
+        
+        response = Response(data, mimetype=IMAGE_CONTENT_TYPES[image_format])
+        response.headers['Cache-Control'] = 'private, max-age=86400'
+        response.vary.add('Accept')
+        return response
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/archive_tasks', methods=['POST'])
+@admin_required
+@limit_concurrency('heavy_query')
+def archive_tasks():
+    """Move old Completed/Delivered tasks into the archive collection"""
+    try:
+        data = request.get_json(silent=True) or {}
+        older_than_days = data.get('older_than_days', app.config['TASK_ARCHIVE_AFTER_DAYS'])
+        
+        if not isinstance(older_than_days, int) or older_than_days < 0:
+            return jsonify({'error': 'Invalid number of days'}), 400
+        
+        archived = archive_completed_tasks(older_than_days=older_than_days)
+        return jsonify({'success': True, 'archived': archived})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/writers/<writer_id>/payout', methods=['POST'])
+@admin_required
+def pay_writer(writer_id):
+    """Settle all of a writer's unpaid Completed/Delivered tasks in one batch"""
+    try:
+        if not get_storage().get_writer_by_id(writer_id):
+            return jsonify({'error': 'Writer not found'}), 404
+        
+        payout = settle_writer_payouts(writer_id)
+        note_recent_write()
+        if not payout:
+            return jsonify({'success': True, 'payout': None, 'message': 'Nothing outstanding for this writer'})
+        return jsonify({
+            'success': True,
+            'payout': payout,
+            'message': f"Paid ₹{payout['amount']} for {len(payout['task_ids'])} tasks"
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/ledger/reconcile', methods=['GET', 'POST'])
+@admin_required
+@limit_concurrency('heavy_query')
+def reconcile_ledger():
+    """Report writer counters that disagree with their tasks (POST also fixes them)"""
+    try:
+        mismatches = reconcile_writer_ledger(fix=request.method == 'POST')
+        return jsonify({'success': True, 'fixed': request.method == 'POST', 'mismatches': mismatches})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/admin/export/tasks', methods=['GET'])
+@admin_required
+@rate_limit('export')
+def export_tasks_endpoint():
+    """Stream tasks as CSV or NDJSON, filtered by ?from=&to=&status=&writer_id=, resumable with ?after="""
+    try:
+        export_format = request.args.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': 'Format must be csv or ndjson'}), 400
+        
+        after = request.args.get('after')
+        try:
+            query = build_export_query(
+                date_from=request.args.get('from'),
+                date_to=request.args.get('to'),
+                status=request.args.get('status'),
+                writer_id=request.args.get('writer_id'),
+                after=after
+            )
+        except ValueError:
+            return jsonify({'error': 'Dates must be YYYY-MM-DD'}), 400
+        
+        # Resumed exports are appended to the earlier file, so they carry no header
+        chunks = export_tasks(query, export_format, include_header=not after)
+        filename = f"tasks.{export_format}"
+        mimetype = EXPORT_FORMATS[export_format]
+        if request.args.get('gzip') == 'true':
+            chunks = gzip_chunks(chunks)
+            filename += '.gz'
+            mimetype = 'application/gzip'
+        
+        return Response(
+            stream_with_context(chunks),
+            mimetype=mimetype,
+            headers={'Content-Disposition': f'attachment; filename={filename}'}
+        )
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/rate_card', methods=['GET'])
 def get_rate_card():
     return jsonify(RATE_CARD)
@@ -828,12 +1539,12 @@ def calculate_price():
 def health_check():
     """Health check endpoint to verify API is running"""
     try:
-        # Test MongoDB connection
-        db = get_db()
-        db.command('ping')
+        # Test database connection
+        get_storage().ping()
         return jsonify({
             'status': 'healthy',
-            'mongodb': 'connected',
+            'mongodb': 'connected' if STORAGE_BACKEND == 'mongo' else 'not used',
+            'storage': STORAGE_BACKEND,
             'environment': 'production' if os.environ.get('VERCEL') else 'local'
         })
     except Exception as e:
@@ -842,6 +1553,173 @@ def health_check():
             'error': str(e)
         }), 500
 
+@app.cli.command('create-admin')
+@click.option('--username', prompt=True, help='Admin username')
+@click.option('--email', default='', help='Admin email')
+@click.password_option(help='Admin password (prompted if omitted)')
+def create_admin_command(username, email, password):
+    """Create an admin account (there is no signup for admins)"""
+    if get_admin_by_username(username):
+        raise click.ClickException(f"Admin {username} already exists")
+    get_storage().create_admin({
+        'username': username,
+        'email': email,
+        'password': generate_password_hash(password),
+        'role': 'admin'
+    })
+    print(f"Created admin {username}")
+
+@app.cli.command('archive-tasks')
+def archive_tasks_command():
+    """Archive old Completed/Delivered tasks (run from cron: flask --app app archive-tasks)"""
+    archived = archive_completed_tasks()
+    print(f"Archived {archived} tasks")
+
+@app.cli.command('process-images')
+def process_images_command():
+    """Generate missing previews for stored image uploads"""
+    if not IMAGE_SUPPORT:
+        raise click.ClickException('Image previews need Pillow (pip install Pillow)')
+    storage = get_storage()
+    processed = 0
+    failed = 0
+    for task in find_tasks({}):
+        for index, file_info in enumerate(task.get('user_uploaded_files') or []):
+            filename = file_info.get('filename') if isinstance(file_info, dict) else file_info
+            if not filename or not is_image(filename):
+                continue
+            if storage.get_task_file_variant(task['task_id'], index, 'thumb_jpeg') is not None:
+                continue
+            if storage.get_task_file_variant(task['task_id'], index, IMAGE_FAILED_VARIANT) is not None:
+                continue
+            try:
+                if process_task_image(task['task_id'], index):
+                    processed += 1
+            except Exception as e:
+                record_image_failure(task['task_id'], index, e)
+                failed += 1
+    print(f"Generated previews for {processed} images, {failed} could not be decoded")
+
+@app.cli.command('reconcile-ledger')
+@click.option('--fix', is_flag=True, help='Backfill missing ledger entries and reset counters')
+def reconcile_ledger_command(fix):
+    """Check writer earnings counters against their tasks"""
+    mismatches = reconcile_writer_ledger(fix=fix)
+    for mismatch in mismatches:
+        print(f"{mismatch['username']}: expected {mismatch['expected']}, counters {mismatch['actual']}")
+    print(f"{len(mismatches)} writers {'fixed' if fix else 'out of balance'}")
+
+def parse_resume_line(line, export_format):
+    """Resume token from one exported row, None for the CSV header"""
+    if export_format == 'csv':
+        row = next(csv.reader([line]))
+        if row == EXPORT_FIELDS:
+            return None
+        row = dict(zip(EXPORT_FIELDS, row))
+    else:
+        row = json.loads(line)
+    return f"{row['created_at']}|{row['task_id']}"
+
+def scan_gzip_export(path):
+    """(end offset of the last complete gzip member, last line in the complete members)
+
+    An interrupted export ends in a truncated member, which gzip.open refuses
+    to read; everything after the last complete member is discarded.
+    """
+    valid_end = 0
+    consumed = 0
+    last_line = None
+    member_last_line = None
+    tail = b''
+    decompressor = zlib.decompressobj(31)
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(EXPORT_CHUNK_SIZE)
+            if not data:
+                break
+            while data:
+                try:
+                    out = decompressor.decompress(data)
+                except zlib.error:
+                    return valid_end, last_line
+                lines = (tail + out).split(b'\n')
+                tail = lines.pop()
+                if lines:
+                    member_last_line = lines[-1]
+                if not decompressor.eof:
+                    consumed += len(data)
+                    break
+                # Member complete - more members may follow in the same chunk
+                consumed += len(data) - len(decompressor.unused_data)
+                valid_end = consumed
+                if member_last_line is not None:
+                    last_line = member_last_line
+                data = decompressor.unused_data
+                decompressor = zlib.decompressobj(31)
+    return valid_end, last_line
+
+def read_resume_token(path, export_format):
+    """Resume token from the last complete row of an earlier (uncompressed) export file, None if it has no rows"""
+    last_line = None
+    with open(path, 'rt', newline='') as f:
+        for line in f:
+            if line.endswith('\n'):
+                last_line = line
+    if last_line is None:
+        return None
+    return parse_resume_line(last_line, export_format)
+
+@app.cli.command('export-tasks')
+@click.option('--format', 'export_format', type=click.Choice(list(EXPORT_FORMATS)), default='csv')
+@click.option('--from', 'date_from', help='First creation date, YYYY-MM-DD')
+@click.option('--to', 'date_to', help='Last creation date, YYYY-MM-DD')
+@click.option('--status', help='Comma separated statuses')
+@click.option('--writer', 'writer_id', help='Writer id')
+@click.option('--output', help='Output file (.gz for gzip), stdout if omitted')
+@click.option('--resume', is_flag=True, help='Continue an interrupted export into --output')
+def export_tasks_command(export_format, date_from, date_to, status, writer_id, output, resume):
+    """Stream tasks to CSV/NDJSON for accounting"""
+    after = None
+    if resume:
+        if not output or not os.path.exists(output):
+            raise click.UsageError('--resume needs an existing --output file')
+        if output.endswith('.gz'):
+            # Drop a truncated last gzip member, so the new member follows complete ones
+            valid_end, last_line = scan_gzip_export(output)
+            with open(output, 'rb+') as f:
+                f.truncate(valid_end)
+            after = parse_resume_line(last_line.decode('utf-8'), export_format) if last_line is not None else None
+        else:
+            after = read_resume_token(output, export_format)
+            # Drop a partially written last line before appending
+            with open(output, 'rb+') as f:
+                data_end = f.seek(0, os.SEEK_END)
+                while data_end > 0:
+                    f.seek(data_end - 1)
+                    if f.read(1) == b'\n':
+                        break
+                    data_end -= 1
+                f.truncate(data_end)
+    
+    query = build_export_query(date_from, date_to, status, writer_id, after)
+    include_header = not resume or os.path.getsize(output) == 0
+    chunks = export_tasks(query, export_format, include_header=include_header)
+    if output is None:
+        for chunk in chunks:
+            sys.stdout.write(chunk)
+        return
+    
+    # Gzip files are resumed by appending new gzip members, which readers treat as one stream
+    if output.endswith('.gz'):
+        with open(output, 'ab' if resume else 'wb') as f:
+            for data in gzip_chunks(chunks):
+                f.write(data)
+    else:
+        with open(output, 'a' if resume else 'w', newline='') as f:
+            for chunk in chunks:
+                f.write(chunk)
+    print(f"Exported tasks to {output}", file=sys.stderr)
+
 # Vercel serverless function handler
 app_handler = app
 
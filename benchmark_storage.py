@@ -0,0 +1,154 @@
+"""Compare per-route latency of the storage backends.
+
+Seeds each backend with the same users, writers and tasks, then calls the
+API routes in-process through Flask's test client and prints p50/p99
+latency per route. Passwords are hashed with a single PBKDF2 round so
+timings reflect storage rather than password hashing, and rate limiting
+is switched off.
+
+SQLite always runs (in a temporary file). MongoDB runs when --mongo-uri is
+given; point it at a scratch database, as its collections are cleared
+before seeding.
+
+Usage:
+    SECRET_KEY=dev python benchmark_storage.py --tasks 5000 --repeat 200
+    SECRET_KEY=dev python benchmark_storage.py --mongo-uri mongodb://localhost:27017/workx_bench
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+os.environ.setdefault('STORAGE_BACKEND', 'sqlite')
+
+from werkzeug.security import generate_password_hash
+
+import app as workx
+from load_test import percentile
+from storage import MongoStorage, SQLiteStorage
+
+PASSWORD = 'benchmark'
+STATUSES = ['Pending', 'In Progress', 'Completed', 'Delivered']
+
+
+def seed(storage, users, writers, tasks):
+    """Fill storage with accounts and tasks, return (user names, writer names, pending task ids)"""
+    password = generate_password_hash(PASSWORD, method='pbkdf2:sha256:1')
+    storage.create_admin({'username': 'admin', 'password': password})
+
+    user_ids = []
+    for index in range(users):
+        user_ids.append(str(uuid.uuid4()))
+        storage.create_user({'id': user_ids[-1], 'username': f'user{index}', 'email': f'user{index}@example.com',
+                             'password': password, 'phone': '', 'created_at': datetime.now().isoformat()})
+    writer_ids = []
+    for index in range(writers):
+        writer_ids.append(str(uuid.uuid4()))
+        storage.create_writer({'id': writer_ids[-1], 'username': f'writer{index}', 'email': f'writer{index}@example.com',
+                               'password': password, 'phone': '', 'created_at': datetime.now().isoformat(),
+                               'completed_tasks': 0, 'earnings': 0.0, 'paid_out': 0.0})
+
+    rng = random.Random(42)
+    start = datetime.now() - timedelta(days=90)
+    pending = []
+    for index in range(tasks):
+        status = rng.choice(STATUSES)
+        created_at = (start + timedelta(minutes=index * 10)).isoformat()
+        writer_index = rng.randrange(writers)
+        task = {
+            'task_id': f'BM{index:06d}',
+            'work_type': 'Report',
+            'pages': rng.randint(1, 20),
+            'final_price': 112.0,
+            'worker_payout': 100.0,
+            'payment_received': status != 'Pending',
+            'writer_paid': False,
+            'user_id': user_ids[rng.randrange(users)],
+            'writer_id': None if status == 'Pending' else writer_ids[writer_index],
+            'writer_username': None if status == 'Pending' else f'writer{writer_index}',
+            'status': status,
+            'deadline': created_at,
+            'user_uploaded_files': [{'filename': 'brief.txt', 'content_type': 'text/plain'}],
+            'admin_uploaded_result': None,
+            'created_at': created_at
+        }
+        if status in ('Completed', 'Delivered'):
+            task['completed_at'] = created_at
+        storage.insert_task(task)
+        if status == 'Pending':
+            pending.append(task['task_id'])
+    return [f'user{i}' for i in range(users)], [f'writer{i}' for i in range(writers)], pending
+
+
+def login(username, user_type):
+    client = workx.app.test_client()
+    response = client.post('/api/login', json={'username': username, 'password': PASSWORD, 'user_type': user_type})
+    assert response.status_code == 200, response.get_json()
+    return client
+
+
+def timed(results, route, call):
+    start = time.perf_counter()
+    response = call()
+    results.setdefault(route, []).append(time.perf_counter() - start)
+    assert response.status_code < 500, (route, response.get_json())
+
+
+def run_routes(usernames, writer_names, pending, repeat):
+    """Call each route repeat times, return {route: [latencies]}"""
+    rng = random.Random(7)
+    results = {}
+    admin = login('admin', 'admin')
+    for _ in range(repeat):
+        timed(results, 'POST /api/login', lambda: workx.app.test_client().post(
+            '/api/login', json={'username': rng.choice(usernames), 'password': PASSWORD, 'user_type': 'user'}))
+        user = login(rng.choice(usernames), 'user')
+        writer = login(rng.choice(writer_names), 'writer')
+        timed(results, 'GET /api/user/my_orders', lambda: user.get('/api/user/my_orders'))
+        timed(results, 'GET /api/writer/available_tasks', lambda: writer.get('/api/writer/available_tasks'))
+        timed(results, 'GET /api/writer/my_tasks', lambda: writer.get('/api/writer/my_tasks'))
+        if pending:
+            task_id = pending.pop()
+            timed(results, 'POST /api/writer/claim_task', lambda: writer.post('/api/writer/claim_task', json={'task_id': task_id}))
+            timed(results, 'POST /api/writer/mark_complete', lambda: writer.post('/api/writer/mark_complete', json={'task_id': task_id}))
+            timed(results, 'POST /api/admin/update_task', lambda: admin.post(
+                '/api/admin/update_task', data={'task_id': task_id, 'worker_payout': '120', 'writer_paid': 'true'}))
+    # Full listings and exports are slow by design, so run them fewer times
+    for _ in range(max(1, repeat // 20)):
+        timed(results, 'GET /api/admin/tasks', lambda: admin.get('/api/admin/tasks?include_archived=true'))
+        timed(results, 'GET /api/admin/export/tasks', lambda: admin.get('/api/admin/export/tasks?format=csv'))
+    return results
+
+
+def benchmark(name, storage, args):
+    workx._storage = storage
+    seed_start = time.perf_counter()
+    usernames, writer_names, pending = seed(storage, args.users, args.writers, args.tasks)
+    print(f"\n{name}: seeded {args.tasks} tasks in {time.perf_counter() - seed_start:.1f}s")
+    results = run_routes(usernames, writer_names, pending, args.repeat)
+    print(f"{'route':<36}{'n':>6}{'p50 ms':>10}{'p99 ms':>10}")
+    for route, latencies in results.items():
+        print(f"{route:<36}{len(latencies):>6}{percentile(latencies, 50) * 1000:>10.2f}{percentile(latencies, 99) * 1000:>10.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark WorkX storage backends')
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--writers', type=int, default=50)
+    parser.add_argument('--tasks', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--mongo-uri', help='Scratch MongoDB database to benchmark as well')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        benchmark('sqlite', SQLiteStorage(os.path.join(tmp, 'benchmark.db')), args)
+
+    if args.mongo_uri:
+        mongo = MongoStorage(args.mongo_uri, max_pool_size=10)
+        for collection in ('tasks', 'tasks_archive', 'task_files', 'users', 'writers', 'admin', 'ledger'):
+            mongo.db[collection].delete_many({})
+        benchmark('mongo', mongo, args)
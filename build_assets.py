@@ -0,0 +1,136 @@
+"""Build static assets for production.
+
+Minifies static/css and static/js, writes fingerprinted copies to static/dist
+together with precompressed .gz (and .br when the brotli package is installed)
+variants, and records the mapping in static/dist/manifest.json. app.py reads
+the manifest so url_for('static', ...) emits the hashed file names.
+
+Usage:
+    python build_assets.py            # build assets
+    python build_assets.py --report   # build and print page weight before/after
+"""
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+
+from rcssmin import cssmin
+from rjsmin import jsmin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(BASE_DIR, 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+MANIFEST_FILE = os.path.join(DIST_DIR, 'manifest.json')
+
+STATIC_REF_RE = re.compile(r"url_for\('static', filename='([^']+)'\)")
+
+
+def minify_js(source):
+    """Minify JavaScript with rJSmin, which handles strings, template literals, regex literals and ASI"""
+    return jsmin(source).strip() + '\n'
+
+
+def minify_css(source):
+    """Minify CSS with rCSSmin"""
+    return cssmin(source).strip() + '\n'
+
+
+MINIFIERS = {
+    '.css': minify_css,
+    '.js': minify_js,
+}
+
+
+def collect_sources():
+    """Yield paths of CSS/JS files relative to static/, skipping the build output"""
+    for root, dirs, files in os.walk(STATIC_DIR):
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != DIST_DIR)
+        for name in sorted(files):
+            if os.path.splitext(name)[1] in MINIFIERS:
+                yield os.path.relpath(os.path.join(root, name), STATIC_DIR).replace(os.sep, '/')
+
+
+def write_variants(path, data):
+    """Write file plus precompressed gzip/brotli variants"""
+    with open(path, 'wb') as f:
+        f.write(data)
+    with open(path + '.gz', 'wb') as f:
+        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        with open(path + '.br', 'wb') as f:
+            f.write(brotli.compress(data, quality=11))
+
+
+def build():
+    """Build static/dist and return the manifest"""
+    if os.path.isdir(DIST_DIR):
+        shutil.rmtree(DIST_DIR)
+
+    manifest = {}
+    for rel_path in collect_sources():
+        with open(os.path.join(STATIC_DIR, rel_path), encoding='utf-8') as f:
+            source = f.read()
+        stem, ext = os.path.splitext(rel_path)
+        data = MINIFIERS[ext](source).encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()[:10]
+        hashed_path = f"dist/{stem}.{digest}{ext}"
+
+        out_path = os.path.join(STATIC_DIR, hashed_path)
+        os.makedirs(os.path.dirname(out_path), exist_ok=True)
+        write_variants(out_path, data)
+        manifest[rel_path] = hashed_path
+
+    with open(MANIFEST_FILE, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def file_size(path):
+    return os.path.getsize(path) if os.path.exists(path) else None
+
+
+def page_weight_report(manifest):
+    """Print per-page weight of HTML plus referenced CSS/JS, before and after the build"""
+    print(f"{'page':<24}{'before':>10}{'minified':>10}{'gzip':>10}{'brotli':>10}")
+    totals = [0, 0, 0, 0]
+    for name in sorted(os.listdir(TEMPLATES_DIR)):
+        if not name.endswith('.html'):
+            continue
+        with open(os.path.join(TEMPLATES_DIR, name), 'rb') as f:
+            html = f.read()
+        # HTML is compressed on the fly by the response compression middleware
+        html_gz = len(gzip.compress(html, compresslevel=6))
+        html_br = len(brotli.compress(html)) if brotli is not None else None
+
+        before = minified = gz = br = 0
+        before += len(html)
+        minified += len(html)
+        gz += html_gz
+        br += html_br if html_br is not None else html_gz
+        for ref in STATIC_REF_RE.findall(html.decode('utf-8')):
+            before += os.path.getsize(os.path.join(STATIC_DIR, ref))
+            hashed = os.path.join(STATIC_DIR, manifest.get(ref, ref))
+            minified += os.path.getsize(hashed)
+            gz += file_size(hashed + '.gz') or os.path.getsize(hashed)
+            br += file_size(hashed + '.br') or file_size(hashed + '.gz') or os.path.getsize(hashed)
+
+        for index, value in enumerate((before, minified, gz, br)):
+            totals[index] += value
+        print(f"{name:<24}{before:>10}{minified:>10}{gz:>10}{br if brotli else '-':>10}")
+    print(f"{'total':<24}{totals[0]:>10}{totals[1]:>10}{totals[2]:>10}{totals[3] if brotli else '-':>10}")
+
+
+if __name__ == '__main__':
+    manifest = build()
+    print(f"Built {len(manifest)} assets into {os.path.relpath(DIST_DIR, BASE_DIR)}")
+    if '--report' in sys.argv:
+        page_weight_report(manifest)
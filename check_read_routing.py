@@ -0,0 +1,138 @@
+"""Check replica set read routing against a real MongoDB replica set.
+
+Seeds a scratch database, calls the API routes in-process through Flask's
+test client and records every command the driver sends with a pymongo
+CommandListener. Listing, history and export reads must reach a secondary;
+claims, admin updates and the read after a write must reach the primary,
+and the read-back after an admin update must be causally ordered after
+its writes (same session, afterClusterTime). Exits non-zero on failure.
+
+Needs a replica set with at least one secondary, e.g. the three-member set
+from the README. Point --mongo-uri at a scratch database, as its
+collections are cleared before seeding.
+
+Usage:
+    SECRET_KEY=dev python check_read_routing.py \\
+        --mongo-uri "mongodb://localhost:27017,localhost:27018,localhost:27019/workx_routing?replicaSet=rs0"
+"""
+import argparse
+import os
+import sys
+import time
+
+os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+os.environ.setdefault('STORAGE_BACKEND', 'sqlite')  # replaced by the MongoStorage created below
+
+from pymongo import monitoring
+
+import app as workx
+from benchmark_storage import login, seed
+from storage import MongoStorage
+
+TASK_COLLECTIONS = ('tasks', 'tasks_archive')
+
+
+class CommandLog(monitoring.CommandListener):
+    """Keeps every command started by the driver"""
+
+    def __init__(self):
+        self.events = []
+
+    def started(self, event):
+        self.events.append(event)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+def task_commands(log, call):
+    """Run call, return the command started events it sent to the task collections"""
+    log.events.clear()
+    response = call()
+    assert response.status_code == 200, response.get_json()
+    commands = []
+    for event in log.events:
+        collection = event.command.get('collection') if event.command_name == 'getMore' else event.command.get(event.command_name)
+        if collection in TASK_COLLECTIONS:
+            commands.append(event)
+    return commands
+
+
+def wait_for_secondaries(client, timeout=30):
+    deadline = time.time() + timeout
+    while not client.secondaries:
+        if time.time() > deadline:
+            sys.exit('No secondary found - --mongo-uri must point at a replica set with secondaries')
+        time.sleep(0.5)
+
+
+def run_checks(storage, log, pending):
+    """Return a list of (check, passed, detail)"""
+    primary = storage._client.primary
+    results = []
+
+    def expect(check, commands, target):
+        addresses = {event.connection_id for event in commands}
+        if target == 'primary':
+            passed = bool(commands) and addresses == {primary}
+        else:
+            passed = bool(commands) and primary not in addresses
+        results.append((check, passed, f"{[event.command_name for event in commands]} -> {sorted(addresses)}"))
+
+    admin = login('admin', 'admin')
+    user = login('user0', 'user')
+    writer = login('writer0', 'writer')
+    expect('admin listing reads from a secondary', task_commands(log, lambda: admin.get('/api/admin/tasks')), 'secondary')
+    expect('order history reads from a secondary', task_commands(log, lambda: user.get('/api/user/my_orders')), 'secondary')
+    expect('writer history reads from a secondary', task_commands(log, lambda: writer.get('/api/writer/my_tasks')), 'secondary')
+    expect('export reads from a secondary',
+           task_commands(log, lambda: admin.get('/api/admin/export/tasks?format=csv')), 'secondary')
+
+    task_id = pending.pop()
+    expect('claim goes to the primary',
+           task_commands(log, lambda: writer.post('/api/writer/claim_task', json={'task_id': task_id})), 'primary')
+    expect('writer history after a claim reads from the primary',
+           task_commands(log, lambda: writer.get('/api/writer/my_tasks')), 'primary')
+
+    commands = task_commands(log, lambda: admin.post('/api/admin/update_task', data={'task_id': task_id, 'worker_payout': '120'}))
+    expect('admin update goes to the primary', commands, 'primary')
+    writes = [event for event in commands if event.command_name == 'update']
+    read_back = [event for event in commands if event.command_name == 'find'][-1:]
+    causal = bool(writes and read_back) and (
+        read_back[0].command.get('lsid') == writes[0].command.get('lsid')
+        and 'afterClusterTime' in read_back[0].command.get('readConcern', {})
+    )
+    results.append(('read-back after an admin update is causal', causal,
+                    f"readConcern {read_back[0].command.get('readConcern') if read_back else None}"))
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Check WorkX read routing on a MongoDB replica set')
+    parser.add_argument('--mongo-uri', required=True, help='Scratch database on a replica set')
+    parser.add_argument('--tasks', type=int, default=200)
+    args = parser.parse_args()
+
+    log = CommandLog()
+    monitoring.register(log)
+    storage = MongoStorage(
+        args.mongo_uri,
+        max_pool_size=workx.app.config['MONGO_MAX_POOL_SIZE'],
+        read_preferences=workx.app.config['READ_PREFERENCES'],
+        max_staleness=workx.app.config['READ_MAX_STALENESS_SECONDS']
+    )
+    wait_for_secondaries(storage._client)
+    for collection in ('tasks', 'tasks_archive', 'task_files', 'users', 'writers', 'admin', 'ledger'):
+        storage.db[collection].delete_many({})
+    workx._storage = storage
+    _, _, pending = seed(storage, 5, 3, args.tasks)
+
+    failed = 0
+    for check, passed, detail in run_checks(storage, log, pending):
+        print(f"{'PASS' if passed else 'FAIL'}  {check}: {detail}")
+        failed += not passed
+    print(f"{failed} checks failed" if failed else 'All checks passed')
+    sys.exit(1 if failed else 0)
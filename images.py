@@ -0,0 +1,119 @@
+"""Previews and recompression for uploaded images.
+
+Pure functions over image bytes; app.py decides when to run them (on a
+background thread) and where the results are stored. Pillow is optional -
+without it IMAGE_SUPPORT is False and uploads are kept as they are.
+"""
+import io
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+IMAGE_SUPPORT = Image is not None
+WEBP_SUPPORT = IMAGE_SUPPORT and features.check('webp')
+
+IMAGE_CONTENT_TYPES = {
+    'jpeg': 'image/jpeg',
+    'png': 'image/png',
+    'webp': 'image/webp'
+}
+# Quality settings tried, best first, when recompressing within a size budget
+QUALITY_STEPS = (90, 85, 80, 75, 70, 65, 60)
+# Largest image decoded (width x height). A small, highly compressible PNG
+# can declare a huge canvas; this keeps each decode to a few hundred MB.
+MAX_PIXELS = 50_000_000
+
+
+def is_image(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ('png', 'jpg', 'jpeg')
+
+
+def open_image(data, max_side=None):
+    """Decode image bytes upright (EXIF orientation applied), return (image, format)
+
+    Images over MAX_PIXELS raise ValueError before anything is decoded. The
+    format ('JPEG', 'PNG', ...) is read before transposing, as the
+    transposed copy no longer carries it. For JPEGs, max_side lets the
+    decoder scale down by a power of two while decoding, which is much
+    faster than decoding a full phone photo.
+    """
+    image = Image.open(io.BytesIO(data))
+    # Only the header has been read so far, so this check is cheap
+    if image.width * image.height > MAX_PIXELS:
+        raise ValueError(f'Image is {image.width}x{image.height}, larger than {MAX_PIXELS} pixels')
+    image_format = image.format
+    if max_side and image_format == 'JPEG':
+        image.draft('RGB', (max_side, max_side))
+    return ImageOps.exif_transpose(image), image_format
+
+
+def content_type_of(data):
+    """Content type of encoded image bytes, judged from the bytes themselves"""
+    image_format = Image.open(io.BytesIO(data)).format
+    return IMAGE_CONTENT_TYPES.get((image_format or '').lower())
+
+
+def flatten(image):
+    """RGB copy of image with any transparency composited onto white"""
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def encode(image, image_format, quality):
+    buffer = io.BytesIO()
+    if image_format == 'webp':
+        image.save(buffer, 'WEBP', quality=quality, method=4)
+    elif image_format == 'png':
+        image.save(buffer, 'PNG', optimize=True)
+    else:
+        image.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def make_variants(data, sizes, quality):
+    """Downscaled copies of an image as {'<size>_<format>': bytes}
+
+    sizes maps a variant name to its longest side in pixels. Each size is
+    encoded as JPEG, and as WebP when Pillow was built with WebP support.
+    """
+    image = flatten(open_image(data, max_side=max(sizes.values()))[0])
+    variants = {}
+    # Largest first, so each smaller size is resampled from the previous one
+    for name, max_side in sorted(sizes.items(), key=lambda item: -item[1]):
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+        variants[f'{name}_jpeg'] = encode(image, 'jpeg', quality)
+        if WEBP_SUPPORT:
+            variants[f'{name}_webp'] = encode(image, 'webp', quality)
+    return variants
+
+
+def recompress(data, max_side, max_bytes, min_quality):
+    """Smaller copy of an original upload in the same format, None if it can't be made smaller
+
+    JPEGs are re-encoded at the best quality in QUALITY_STEPS that fits
+    max_bytes (never below min_quality). PNGs stay lossless and are only
+    downscaled and optimized. Images larger than max_side are downscaled.
+    """
+    image, source_format = open_image(data)
+    image_format = 'png' if source_format == 'PNG' else 'jpeg'
+    if max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.LANCZOS)
+
+    if image_format == 'png':
+        result = encode(image, 'png', None)
+    else:
+        image = flatten(image)
+        result = None
+        for quality in QUALITY_STEPS:
+            if quality < min_quality:
+                break
+            result = encode(image, 'jpeg', quality)
+            if len(result) <= max_bytes:
+                break
+    return result if result is not None and len(result) < len(data) else None
@@ -0,0 +1,127 @@
+"""Simple load generator for checking admission control under overload.
+
+Fires requests from many concurrent threads at one endpoint and prints the
+status code breakdown and latency percentiles. Rejected requests (429/503)
+should come back fast and the p99 of accepted requests should stay bounded
+as concurrency grows. All requests come from one client, so run the server
+with RATE_LIMIT_ENABLED=false to exercise the concurrency caps alone.
+
+Usage:
+    python load_test.py --url http://localhost:5000/api/login \\
+        --json '{"username": "admin", "password": "wrong", "user_type": "admin"}' \\
+        --concurrency 50 --requests 1000
+
+With --serve the app is started in-process on a threaded local server over
+a temporary SQLite database, and --url is a path. --lookup-delay adds a
+fixed delay to admin account lookups, which run one at a time, to stand
+in for a slow database behind a single pooled connection. The
+admission control figures for /api/login were measured like this, with
+64 threads and 640 requests:
+
+    LOGIN='{"username": "admin", "password": "wrong", "user_type": "admin"}'
+    # no admission control
+    RATE_LIMIT_ENABLED=false MAX_CONCURRENT_AUTH=1000 SECRET_KEY=dev python load_test.py --serve \\
+        --lookup-delay 0.2 --url /api/login --json "$LOGIN" --concurrency 64 --requests 640
+    # concurrency cap only
+    RATE_LIMIT_ENABLED=false SECRET_KEY=dev python load_test.py --serve \\
+        --lookup-delay 0.2 --url /api/login --json "$LOGIN" --concurrency 64 --requests 640
+    # rate limit and concurrency cap
+    SECRET_KEY=dev python load_test.py --serve \\
+        --lookup-delay 0.2 --url /api/login --json "$LOGIN" --concurrency 64 --requests 640
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+
+def send_request(url, body):
+    """Send one request, return (status code, latency in seconds)"""
+    headers = {'Content-Type': 'application/json'} if body is not None else {}
+    req = urllib.request.Request(url, data=body, headers=headers, method='POST' if body is not None else 'GET')
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=30) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    except Exception:
+        status = 'error'
+    return status, time.perf_counter() - start
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(pct / 100.0 * (len(values) - 1))))
+    return values[index]
+
+
+def serve(lookup_delay):
+    """Start the app on a threaded local server over a temporary SQLite database, return its base URL"""
+    os.environ['STORAGE_BACKEND'] = 'sqlite'
+    os.environ['SQLITE_PATH'] = os.path.join(tempfile.mkdtemp(), 'load_test.db')
+    from werkzeug.serving import make_server
+
+    import app as workx
+    storage = workx.get_storage()
+    if lookup_delay:
+        # One lookup at a time, like MongoDB behind the default single-connection pool (MONGO_MAX_POOL_SIZE=1)
+        get_admin_by_username = storage.get_admin_by_username
+        connection = threading.Lock()
+
+        def slow_get_admin_by_username(username):
+            with connection:
+                time.sleep(lookup_delay)
+                return get_admin_by_username(username)
+        storage.get_admin_by_username = slow_get_admin_by_username
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)  # no per-request log lines
+    server = make_server('127.0.0.1', 0, workx.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def run(url, body, concurrency, total):
+    results = []
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(send_request, url, body) for _ in range(total)]
+        for future in futures:
+            results.append(future.result())
+
+    statuses = Counter(status for status, _ in results)
+    print(f"{total} requests, concurrency {concurrency}")
+    print("status codes: " + ", ".join(f"{status}={count}" for status, count in sorted(statuses.items(), key=str)))
+    groups = {
+        'all': [latency for _, latency in results],
+        'accepted': [latency for status, latency in results if status not in (429, 503, 'error')],
+        'rejected': [latency for status, latency in results if status in (429, 503)],
+    }
+    for name, latencies in groups.items():
+        if latencies:
+            print(f"{name:<9} n={len(latencies):<6} p50={percentile(latencies, 50) * 1000:.1f}ms "
+                  f"p99={percentile(latencies, 99) * 1000:.1f}ms max={max(latencies) * 1000:.1f}ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Load test a WorkX endpoint')
+    parser.add_argument('--url', required=True, help='Full URL, or a path with --serve')
+    parser.add_argument('--json', help='JSON body (sends POST when given)')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--serve', action='store_true', help='Run the app in-process over a temporary SQLite database')
+    parser.add_argument('--lookup-delay', type=float, default=0.0, help='Seconds added to admin lookups with --serve')
+    args = parser.parse_args()
+    body = json.dumps(json.loads(args.json)).encode('utf-8') if args.json else None
+    url = serve(args.lookup_delay) + args.url if args.serve else args.url
+    run(url, body, args.concurrency, args.requests)
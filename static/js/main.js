@@ -236,6 +236,29 @@ const copyToClipboard = (text) => {
     }
 };
 
+// Image preview thumbnails answer 202 until they are generated, so poll instead of giving up
+const retryThumbnail = async (img, attempts = 5) => {
+    const tries = Number(img.dataset.tries || 0) + 1;
+    img.dataset.tries = tries;
+    if (tries <= attempts && !img.src.startsWith('blob:')) {
+        try {
+            const response = await fetch(img.src);
+            if (response.status === 202) {
+                const wait = Number(response.headers.get('Retry-After') || 2) * 1000;
+                setTimeout(() => retryThumbnail(img, attempts), wait);
+                return;
+            }
+            if (response.ok) {
+                img.src = URL.createObjectURL(await response.blob());
+                return;
+            }
+        } catch (error) {
+            // Fall through and drop the thumbnail
+        }
+    }
+    img.remove();
+};
+
 // Initialize tooltips (if needed)
 const initTooltips = () => {
     const tooltips = document.querySelectorAll('[data-tooltip]');
@@ -398,6 +421,7 @@ if (typeof module !== 'undefined' && module.exports) {
         getStatusBadge,
         storage,
         saveRecentTaskId,
+        retryThumbnail,
         getRecentTaskIds,
         smoothScroll,
         copyToClipboard,
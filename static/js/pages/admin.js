@@ -0,0 +1,220 @@
+let allTasks = [];
+
+async function loadTasks() {
+    document.getElementById('tasksLoading').style.display = 'block';
+    document.getElementById('tasksContent').innerHTML = '';
+
+    try {
+        const response = await fetch('/api/admin/tasks');
+        const data = await response.json();
+
+        if (response.ok) {
+            allTasks = data.tasks;
+            updateStats(allTasks);
+            renderTasks(allTasks);
+        } else {
+            alert('Error loading tasks: ' + data.error);
+        }
+    } catch (error) {
+        alert('Failed to load tasks: ' + error.message);
+    } finally {
+        document.getElementById('tasksLoading').style.display = 'none';
+    }
+}
+
+function updateStats(tasks) {
+    document.getElementById('totalOrders').textContent = tasks.length;
+    document.getElementById('pendingOrders').textContent = tasks.filter(t => t.status === 'Pending').length;
+    document.getElementById('inProgressOrders').textContent = tasks.filter(t => t.status === 'Assigned' || t.status === 'In Progress').length;
+    document.getElementById('completedOrders').textContent = tasks.filter(t => t.status === 'Completed' || t.status === 'Delivered').length;
+}
+
+function renderTasks(tasks) {
+    const container = document.getElementById('tasksContent');
+
+    if (tasks.length === 0) {
+        container.innerHTML = '<div class="no-tasks">No tasks found</div>';
+        return;
+    }
+
+    let html = '<div class="tasks-grid">';
+    tasks.forEach(task => {
+        const statusClass = task.status.toLowerCase().replace(' ', '-');
+        const paymentStatus = task.payment_received ? '✅' : '❌';
+        const writerPaidStatus = task.writer_paid ? '✅' : '❌';
+
+        // User details
+        const userInfo = task.user_details 
+            ? `${task.user_details.username} (${task.user_details.email}, ${task.user_details.phone})`
+            : task.user_contact || 'Unknown';
+
+        // Writer details
+        const writerInfo = task.writer_details
+            ? `${task.writer_details.username} (${task.writer_details.email}, ${task.writer_details.phone})`
+            : task.writer_id || 'Not Assigned';
+
+        // Price display
+        const priceDisplay = task.final_price ? `₹${task.final_price}` : 'Not Set';
+        const materialInfo = task.material_cost > 0 ? ` (includes ₹${task.material_cost} material)` : '';
+        const sameDayInfo = task.is_same_day ? ' ⚡ Same-day' : '';
+
+        html += `
+            <div class="task-card status-${statusClass}">
+                <div class="task-header">
+                    <h4>${task.task_id}</h4>
+                    <span class="status-badge status-${statusClass}">${task.status}</span>
+                </div>
+                <div class="task-body">
+                    <p><strong>User:</strong> ${userInfo}</p>
+                    <p><strong>Work:</strong> ${task.work_type}${sameDayInfo}</p>
+                    <p><strong>Pages:</strong> ${task.pages || 'TBD'} units</p>
+                    <p><strong>Price:</strong> ${priceDisplay}${materialInfo}</p>
+                    <p><strong>Writer:</strong> ${writerInfo}</p>
+                    <p><strong>Deadline:</strong> ${task.deadline}</p>
+                    <p><strong>Payment Received:</strong> ${paymentStatus}</p>
+                    <p><strong>Writer Paid:</strong> ${writerPaidStatus}</p>
+                    ${task.admin_uploaded_result ? '<p class="task-completed">📎 Work Uploaded</p>' : ''}
+                </div>
+                <div class="task-footer">
+                    <button onclick="openEditModal('${task.task_id}')" class="btn btn-sm btn-primary">Manage</button>
+                </div>
+            </div>
+        `;
+    });
+    html += '</div>';
+
+    container.innerHTML = html;
+}
+
+function openEditModal(taskId) {
+    const task = allTasks.find(t => t.task_id === taskId);
+    if (!task) return;
+
+    document.getElementById('modalTaskId').textContent = taskId;
+    document.getElementById('editTaskId').value = task.task_id;
+    document.getElementById('editWorkType').value = task.work_type;
+    document.getElementById('editCurrentStatus').value = task.status;
+    document.getElementById('editPages').value = task.pages || '';
+    document.getElementById('editBasePrice').value = task.base_price || '';
+    document.getElementById('editFinalPrice').value = task.final_price || '';
+    document.getElementById('editWorkerPayout').value = task.worker_payout || '';
+
+    // User details
+    if (task.user_details) {
+        document.getElementById('editUserContact').value = 
+            `${task.user_details.username}\nEmail: ${task.user_details.email}\nPhone: ${task.user_details.phone}`;
+    } else {
+        document.getElementById('editUserContact').value = task.user_contact || 'N/A';
+    }
+
+    // Writer details
+    if (task.writer_details) {
+        document.getElementById('editWriterDetails').value = 
+            `${task.writer_details.username}\nEmail: ${task.writer_details.email}\nPhone: ${task.writer_details.phone}\nCompleted: ${task.writer_details.completed_tasks} tasks\nEarnings: ₹${task.writer_details.earnings}\nOutstanding: ₹${task.writer_details.outstanding}`;
+    } else {
+        document.getElementById('editWriterDetails').value = task.writer_id ? task.writer_username || task.writer_id : 'Not Assigned';
+    }
+
+    document.getElementById('editDeadline').value = task.deadline;
+    document.getElementById('editNotes').value = task.notes || 'N/A';
+    document.getElementById('editStatus').value = task.status;
+    document.getElementById('editWriterId').value = task.writer_id || '';
+    document.getElementById('editPaymentReceived').checked = task.payment_received;
+    document.getElementById('editWriterPaid').checked = task.writer_paid;
+
+    // Show material cost if applicable
+    if (task.material_cost && task.material_cost > 0) {
+        document.getElementById('materialCostInfo').style.display = 'block';
+        document.getElementById('materialCostDisplay').textContent = `₹${task.material_cost}`;
+        const optionText = task.material_option === 'buy' ? 'User requested to purchase material' : 'User will provide material';
+        let infoText = optionText;
+        if (task.is_same_day) {
+            infoText += '<br><span style="color: #f59e0b; font-weight: 600;">⚡ Same-day order - Apply 25% surcharge</span>';
+        }
+        document.getElementById('materialOptionDisplay').innerHTML = infoText;
+    } else if (task.is_same_day) {
+        document.getElementById('materialCostInfo').style.display = 'block';
+        document.getElementById('materialCostDisplay').textContent = 'N/A';
+        document.getElementById('materialOptionDisplay').innerHTML = '<span style="color: #f59e0b; font-weight: 600;">⚡ Same-day order - Apply 25% surcharge</span>';
+    } else {
+        document.getElementById('materialCostInfo').style.display = 'none';
+    }
+
+    // Show current file info
+    if (task.admin_uploaded_result) {
+        document.getElementById('currentFileInfo').innerHTML = `<p class="current-file">Current: ${task.admin_uploaded_result}</p>`;
+    } else {
+        document.getElementById('currentFileInfo').innerHTML = '<p class="text-muted">No file uploaded yet</p>';
+    }
+
+    // Show user uploaded files
+    if (task.user_uploaded_files && task.user_uploaded_files.length > 0) {
+        let filesHtml = '<ul class="files-list">';
+        task.user_uploaded_files.forEach((file, index) => {
+            const filename = typeof file === 'object' ? file.filename : file;
+            const preview = /\.(png|jpe?g)$/i.test(filename)
+                ? `<a href="/api/preview/${task.task_id}/${index}?size=preview" target="_blank"><img src="/api/preview/${task.task_id}/${index}" alt="${filename}" class="file-thumb" loading="lazy" onerror="retryThumbnail(this)"></a>`
+                : '';
+            filesHtml += `<li>${preview}📎 <a href="/api/download_user_file/${task.task_id}/${index}" target="_blank">${filename}</a></li>`;
+        });
+        filesHtml += '</ul>';
+        document.getElementById('userFilesInfo').innerHTML = filesHtml;
+    } else {
+        document.getElementById('userFilesInfo').innerHTML = '<p class="text-muted">No files uploaded</p>';
+    }
+
+    document.getElementById('editModal').style.display = 'flex';
+}
+
+function closeEditModal() {
+    document.getElementById('editModal').style.display = 'none';
+    document.getElementById('editTaskForm').reset();
+}
+
+document.getElementById('editTaskForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const formData = new FormData(e.target);
+
+    try {
+        const response = await fetch('/api/admin/update_task', {
+            method: 'POST',
+            body: formData
+        });
+
+        const data = await response.json();
+
+        if (response.ok) {
+            alert('Task updated successfully!');
+            closeEditModal();
+            loadTasks();
+        } else {
+            alert('Error: ' + data.error);
+        }
+    } catch (error) {
+        alert('Failed to update task: ' + error.message);
+    }
+});
+
+document.getElementById('statusFilter').addEventListener('change', (e) => {
+    const filter = e.target.value;
+    if (filter === 'all') {
+        renderTasks(allTasks);
+    } else {
+        const filtered = allTasks.filter(t => t.status === filter);
+        renderTasks(filtered);
+    }
+});
+
+document.getElementById('refreshBtn').addEventListener('click', loadTasks);
+
+// Load tasks on page load
+loadTasks();
+
+// Close modal on outside click
+window.onclick = function(event) {
+    const modal = document.getElementById('editModal');
+    if (event.target == modal) {
+        closeEditModal();
+    }
+}
@@ -0,0 +1,114 @@
+// Set minimum date to today
+const today = new Date().toISOString().split('T')[0];
+document.getElementById('deadline').min = today;
+
+// Check for same-day deadline and show warning
+document.getElementById('deadline').addEventListener('change', function() {
+    const selectedDate = this.value;
+    const sameDayWarning = document.getElementById('sameDayWarning');
+
+    if (selectedDate === today) {
+        sameDayWarning.style.display = 'block';
+    } else {
+        sameDayWarning.style.display = 'none';
+    }
+});
+
+// Pricing data
+const RATE_CARD = {
+    'Blue Book': { base: 15, unit: 'page' },
+    'Observation': { base: 17, unit: 'page' },
+    'Record-Ruled': { base: 20, unit: 'page' },
+    'Record-Unruled': { base: 15, unit: 'page' },
+    'PPT': { base: 60, unit: '10 slides' },
+    'Word Doc': { base: 50, unit: 'document' },
+    'Report': { base: 100, unit: 'document' }
+};
+
+// Show/hide material option based on work type
+const workTypeSelect = document.getElementById('workType');
+const materialOptionGroup = document.getElementById('materialOptionGroup');
+const buyOptionText = document.getElementById('buyOptionText');
+const priceInfo = document.getElementById('priceInfo');
+
+workTypeSelect.addEventListener('change', function() {
+    const workType = this.value;
+
+    // Show/hide material option
+    if (workType === 'Blue Book') {
+        materialOptionGroup.style.display = 'block';
+        buyOptionText.textContent = 'Buy Blue Book (+₹20)';
+    } else if (workType === 'Record-Ruled' || workType === 'Record-Unruled') {
+        materialOptionGroup.style.display = 'block';
+        buyOptionText.textContent = 'Buy Record Book (+₹90)';
+    } else {
+        materialOptionGroup.style.display = 'none';
+    }
+
+    // Show pricing info
+    if (workType && RATE_CARD[workType]) {
+        const rate = RATE_CARD[workType];
+        const basePrice = rate.base;
+        const platformFee = (basePrice * 0.12).toFixed(2);
+        const finalPrice = (basePrice + parseFloat(platformFee)).toFixed(2);
+        const writerPayout = basePrice.toFixed(2);
+
+        document.getElementById('selectedWorkType').textContent = workType;
+        document.getElementById('basePrice').textContent = `₹${basePrice}/${rate.unit}`;
+        document.getElementById('platformFee').textContent = `₹${platformFee}/${rate.unit}`;
+        document.getElementById('finalPrice').textContent = `₹${finalPrice}/${rate.unit}`;
+        document.getElementById('writerPayout').textContent = `₹${writerPayout}/${rate.unit}`;
+        priceInfo.style.display = 'block';
+    } else {
+        priceInfo.style.display = 'none';
+    }
+});
+
+// Submit Order
+document.getElementById('orderForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const formData = new FormData(e.target);
+
+    // Show loading
+    const submitBtn = document.getElementById('submitBtn');
+    submitBtn.disabled = true;
+    submitBtn.textContent = 'Submitting...';
+
+    try {
+        const response = await fetch('/api/create_task', {
+            method: 'POST',
+            body: formData
+        });
+
+        const data = await response.json();
+
+        if (response.ok) {
+            document.getElementById('taskIdDisplay').textContent = data.task_id;
+            document.getElementById('successModal').style.display = 'flex';
+
+            // Reset form
+            e.target.reset();
+        } else {
+            alert('Error: ' + data.error);
+        }
+    } catch (error) {
+        alert('Failed to create order: ' + error.message);
+    } finally {
+        submitBtn.disabled = false;
+        submitBtn.textContent = 'Submit Order';
+    }
+});
+
+function closeModal() {
+    document.getElementById('successModal').style.display = 'none';
+    window.location.href = '/user-dashboard';
+}
+
+// Close modal on outside click
+window.onclick = function(event) {
+    const modal = document.getElementById('successModal');
+    if (event.target == modal) {
+        closeModal();
+    }
+}
@@ -0,0 +1,39 @@
+// Price calculator functionality
+document.getElementById('calculateBtn').addEventListener('click', async () => {
+    const workType = document.getElementById('workType').value;
+    const pages = parseInt(document.getElementById('pages').value);
+
+    if (!workType) {
+        alert('Please select a work type');
+        return;
+    }
+
+    if (!pages || pages < 1) {
+        alert('Please enter valid number of pages/units');
+        return;
+    }
+
+    try {
+        const response = await fetch('/api/calculate_price', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ work_type: workType, pages: pages })
+        });
+
+        const data = await response.json();
+
+        if (response.ok) {
+            document.getElementById('basePrice').textContent = data.base_price;
+            document.getElementById('platformFee').textContent = data.platform_fee;
+            document.getElementById('finalPrice').textContent = data.final_price;
+            document.getElementById('workerPayout').textContent = data.worker_payout;
+            document.getElementById('priceResult').style.display = 'block';
+        } else {
+            alert('Error: ' + data.error);
+        }
+    } catch (error) {
+        alert('Failed to calculate price: ' + error.message);
+    }
+});
@@ -0,0 +1,36 @@
+document.getElementById('loginForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const formData = new FormData(e.target);
+    const data = {
+        username: formData.get('username'),
+        password: formData.get('password'),
+        user_type: formData.get('user_type')
+    };
+
+    if (!data.user_type) {
+        alert('Please select your account type');
+        return;
+    }
+
+    try {
+        const response = await fetch('/api/login', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(data)
+        });
+
+        const result = await response.json();
+
+        if (response.ok) {
+            alert('Login successful!');
+            window.location.href = result.redirect;
+        } else {
+            alert('Error: ' + result.error);
+        }
+    } catch (error) {
+        alert('Login failed: ' + error.message);
+    }
+});
@@ -0,0 +1,51 @@
+document.getElementById('signupForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const formData = new FormData(e.target);
+    const password = formData.get('password');
+    const confirmPassword = formData.get('confirmPassword');
+
+    if (password !== confirmPassword) {
+        alert('Passwords do not match!');
+        return;
+    }
+
+    if (password.length < 6) {
+        alert('Password must be at least 6 characters long');
+        return;
+    }
+
+    const data = {
+        user_type: formData.get('user_type'),
+        username: formData.get('username'),
+        email: formData.get('email'),
+        phone: formData.get('phone'),
+        password: password
+    };
+
+    if (!data.user_type) {
+        alert('Please select whether you want to be a User or Writer');
+        return;
+    }
+
+    try {
+        const response = await fetch('/api/signup', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify(data)
+        });
+
+        const result = await response.json();
+
+        if (response.ok) {
+            alert(result.message + ' Please login.');
+            window.location.href = '/login';
+        } else {
+            alert('Error: ' + result.error);
+        }
+    } catch (error) {
+        alert('Signup failed: ' + error.message);
+    }
+});
@@ -0,0 +1,69 @@
+async function loadOrders() {
+    document.getElementById('ordersLoading').style.display = 'block';
+    document.getElementById('ordersContent').innerHTML = '';
+
+    try {
+        const response = await fetch('/api/user/my_orders');
+        const data = await response.json();
+
+        if (response.ok) {
+            updateStats(data.orders);
+            renderOrders(data.orders);
+        } else {
+            alert('Error loading orders: ' + data.error);
+        }
+    } catch (error) {
+        alert('Failed to load orders: ' + error.message);
+    } finally {
+        document.getElementById('ordersLoading').style.display = 'none';
+    }
+}
+
+function updateStats(orders) {
+    document.getElementById('totalOrders').textContent = orders.length;
+    document.getElementById('pendingOrders').textContent = orders.filter(o => o.status === 'Pending').length;
+    document.getElementById('inProgressOrders').textContent = orders.filter(o => o.status === 'Assigned' || o.status === 'In Progress').length;
+    document.getElementById('completedOrders').textContent = orders.filter(o => o.status === 'Completed' || o.status === 'Delivered').length;
+}
+
+function renderOrders(orders) {
+    const container = document.getElementById('ordersContent');
+
+    if (orders.length === 0) {
+        container.innerHTML = '<div class="no-orders"><p>You haven\'t created any orders yet.</p><a href="/create-order" class="btn btn-primary">Create Your First Order</a></div>';
+        return;
+    }
+
+    let html = '<div class="orders-grid">';
+    orders.forEach(order => {
+        const statusClass = order.status.toLowerCase().replace(' ', '-');
+        const priceDisplay = order.final_price ? `₹${order.final_price}` : 'TBD';
+
+        html += `
+            <div class="order-card status-${statusClass}">
+                <div class="order-header">
+                    <h4>${order.task_id}</h4>
+                    <span class="status-badge status-${statusClass}">${order.status}</span>
+                </div>
+                <div class="order-body">
+                    <p><strong>Work Type:</strong> ${order.work_type}</p>
+                    <p><strong>Price:</strong> ${priceDisplay}</p>
+                    <p><strong>Deadline:</strong> ${order.deadline}</p>
+                    <p><strong>Created:</strong> ${new Date(order.created_at).toLocaleDateString()}</p>
+                    ${order.writer_username ? '<p><strong>Writer:</strong> ' + order.writer_username + '</p>' : '<p class="text-muted">No writer assigned yet</p>'}
+                    ${(order.status === 'Completed' || order.status === 'Delivered') && order.admin_uploaded_result ? '<p class="task-completed">✅ Work ready for download!</p>' : ''}
+                </div>
+                <div class="order-footer">
+                    ${(order.status === 'Completed' || order.status === 'Delivered') && order.admin_uploaded_result ? 
+                        '<a href="/api/download/' + order.task_id + '" class="btn btn-sm btn-success">📥 Download</a>' : 
+                        '<button class="btn btn-sm btn-secondary" disabled>⏳ ' + order.status + '</button>'}
+                </div>
+            </div>
+        `;
+    });
+    html += '</div>';
+
+    container.innerHTML = html;
+}
+
+loadOrders();
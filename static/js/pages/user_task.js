@@ -0,0 +1,99 @@
+let currentTaskId = null;
+let currentTask = null;
+
+document.getElementById('trackForm').addEventListener('submit', async (e) => {
+    e.preventDefault();
+
+    const taskId = document.getElementById('taskId').value.trim();
+
+    if (!taskId) {
+        alert('Please enter a Task ID');
+        return;
+    }
+
+    // Hide previous results
+    document.getElementById('taskResult').style.display = 'none';
+    document.getElementById('errorMessage').style.display = 'none';
+
+    try {
+        const response = await fetch(`/api/user/task/${taskId}`);
+        const data = await response.json();
+
+        if (response.ok) {
+            currentTaskId = taskId;
+            currentTask = data;
+            displayTaskResult(data);
+        } else {
+            document.getElementById('errorMessage').style.display = 'block';
+        }
+    } catch (error) {
+        alert('Failed to fetch task: ' + error.message);
+    }
+});
+
+function displayTaskResult(task) {
+    document.getElementById('resultTaskId').textContent = task.task_id;
+    document.getElementById('resultWorkType').textContent = task.work_type;
+    document.getElementById('resultPages').textContent = task.pages;
+    document.getElementById('resultPrice').textContent = `₹${task.final_price}`;
+    document.getElementById('resultDeadline').textContent = task.deadline;
+    document.getElementById('resultStatus').textContent = task.status;
+    document.getElementById('paymentAmount').textContent = task.final_price;
+
+    // Update status timeline
+    updateTimeline(task.status);
+
+    // Show download section if work is ready
+    if (task.has_result && task.status === 'Completed') {
+        document.getElementById('downloadSection').style.display = 'block';
+        document.getElementById('notReadySection').style.display = 'none';
+    } else {
+        document.getElementById('downloadSection').style.display = 'none';
+        document.getElementById('notReadySection').style.display = 'block';
+    }
+
+    document.getElementById('taskResult').style.display = 'block';
+}
+
+function updateTimeline(status) {
+    // Reset all
+    document.querySelectorAll('.timeline-item').forEach(item => {
+        item.classList.remove('active', 'completed');
+    });
+
+    // Set completed/active states
+    document.getElementById('status-pending').classList.add('completed');
+
+    if (status === 'Assigned' || status === 'In Progress' || status === 'Completed' || status === 'Delivered') {
+        document.getElementById('status-assigned').classList.add('completed');
+    }
+
+    if (status === 'In Progress' || status === 'Completed' || status === 'Delivered') {
+        document.getElementById('status-progress').classList.add('completed');
+    }
+
+    if (status === 'Completed' || status === 'Delivered') {
+        document.getElementById('status-completed').classList.add('completed');
+    }
+
+    // Set active (current) state
+    if (status === 'Pending') {
+        document.getElementById('status-pending').classList.add('active');
+    } else if (status === 'Assigned') {
+        document.getElementById('status-assigned').classList.add('active');
+    } else if (status === 'In Progress') {
+        document.getElementById('status-progress').classList.add('active');
+    } else if (status === 'Completed' || status === 'Delivered') {
+        document.getElementById('status-completed').classList.add('active');
+    }
+}
+
+document.getElementById('downloadBtn').addEventListener('click', async () => {
+    if (!currentTaskId) return;
+
+    try {
+        window.location.href = `/api/download/${currentTaskId}`;
+    } catch (error) {
+        alert('Failed to download file: ' + error.message);
+    }
+});
@@ -0,0 +1,286 @@
+// Tab switching
+document.querySelectorAll('.tab-btn').forEach(btn => {
+    btn.addEventListener('click', () => {
+        document.querySelectorAll('.tab-btn').forEach(b => b.classList.remove('active'));
+        document.querySelectorAll('.tab-pane').forEach(p => p.classList.remove('active'));
+
+        btn.classList.add('active');
+        document.getElementById(btn.dataset.tab + '-tab').classList.add('active');
+    });
+});
+
+async function loadAvailableTasks() {
+    document.getElementById('availableLoading').style.display = 'block';
+    document.getElementById('availableContent').innerHTML = '';
+
+    try {
+        const response = await fetch('/api/writer/available_tasks');
+        const data = await response.json();
+
+        if (response.ok) {
+            document.getElementById('availableTasks').textContent = data.tasks.length;
+            renderAvailableTasks(data.tasks);
+        } else {
+            alert('Error loading tasks: ' + data.error);
+        }
+    } catch (error) {
+        alert('Failed to load tasks: ' + error.message);
+    } finally {
+        document.getElementById('availableLoading').style.display = 'none';
+    }
+}
+
+async function loadMyTasks() {
+    document.getElementById('myTasksLoading').style.display = 'block';
+    document.getElementById('myTasksContent').innerHTML = '';
+
+    try {
+        const response = await fetch('/api/writer/my_tasks');
+        const data = await response.json();
+
+        if (response.ok) {
+            const myTasksCount = data.tasks.length;
+            const inProgress = data.tasks.filter(t => t.status === 'Assigned' || t.status === 'In Progress').length;
+            const completed = data.tasks.filter(t => t.status === 'Completed').length;
+
+            document.getElementById('myTasks').textContent = myTasksCount;
+            document.getElementById('inProgressTasks').textContent = inProgress;
+            document.getElementById('completedTasks').textContent = completed;
+
+            renderMyTasks(data.tasks);
+        } else {
+            alert('Error loading tasks: ' + data.error);
+        }
+    } catch (error) {
+        alert('Failed to load tasks: ' + error.message);
+    } finally {
+        document.getElementById('myTasksLoading').style.display = 'none';
+    }
+}
+
+// Reference file link, with a thumbnail for images so the original needn't be downloaded
+function userFileItem(taskId, file, index) {
+    const filename = typeof file === 'object' ? file.filename : file;
+    const link = `<a href="/api/download_user_file/${taskId}/${index}" target="_blank" style="color: #4f46e5; text-decoration: underline;">${filename}</a>`;
+    if (!/\.(png|jpe?g)$/i.test(filename)) {
+        return `<li>${link}</li>`;
+    }
+    return `<li><a href="/api/preview/${taskId}/${index}?size=preview" target="_blank"><img src="/api/preview/${taskId}/${index}" alt="${filename}" class="file-thumb" loading="lazy" onerror="retryThumbnail(this)"></a>${link}</li>`;
+}
+
+function renderAvailableTasks(tasks) {
+    const container = document.getElementById('availableContent');
+
+    if (tasks.length === 0) {
+        container.innerHTML = '<div class="no-tasks"><p>No tasks available at the moment. Check back later!</p></div>';
+        return;
+    }
+
+    let html = '<div class="tasks-grid">';
+    tasks.forEach(task => {
+        // Show material cost + TBD for payout
+        let priceDisplay = '';
+        const materialCost = task.material_cost || 0;
+
+        if (materialCost > 0) {
+            priceDisplay = `₹${materialCost} + TBD`;
+        } else {
+            priceDisplay = 'TBD';
+        }
+
+        html += `
+            <div class="task-card">
+                <div class="task-header">
+                    <h4>${task.task_id}</h4>
+                    <span class="status-badge status-pending">Available</span>
+                </div>
+                <div class="task-body">
+                    <p><strong>Work Type:</strong> ${task.work_type}</p>
+                    <p><strong>Payout:</strong> ${priceDisplay}</p>
+                    <p><strong>Deadline:</strong> ${task.deadline}</p>
+                    <p><strong>Posted:</strong> ${new Date(task.created_at).toLocaleDateString()}</p>
+                    ${task.notes ? '<p><strong>Notes:</strong> ' + task.notes + '</p>' : ''}
+                    ${task.user_uploaded_files && task.user_uploaded_files.length > 0 ? `
+                        <div style="margin-top: 0.5rem;">
+                            <strong>📎 Reference Files (${task.user_uploaded_files.length}):</strong>
+                            <ul style="margin: 0.5rem 0; padding-left: 1.5rem;">
+                                ${task.user_uploaded_files.map((file, index) => userFileItem(task.task_id, file, index)).join('')}
+                            </ul>
+                        </div>
+                    ` : ''}
+                    <p class="text-muted"><small>📊 <a href="/pricing" target="_blank">View Price List</a> - Final price determined after completion</small></p>
+                </div>
+                <div class="task-footer">
+                    <button onclick="claimTask('${task.task_id}')" class="btn btn-sm btn-primary">
+                        Claim Task
+                    </button>
+                </div>
+            </div>
+        `;
+    });
+    html += '</div>';
+
+    container.innerHTML = html;
+}
+
+function renderMyTasks(tasks) {
+    const container = document.getElementById('myTasksContent');
+
+    if (tasks.length === 0) {
+        container.innerHTML = '<div class="no-tasks"><p>You haven\'t claimed any tasks yet. Browse available tasks to get started!</p></div>';
+        return;
+    }
+
+    let html = '<div class="tasks-grid">';
+    tasks.forEach(task => {
+        const statusClass = task.status.toLowerCase().replace(' ', '-');
+        const priceDisplay = task.worker_payout ? `₹${task.worker_payout}` : 'TBD';
+        const statusBadgeClass = `status-${statusClass}`;
+
+        html += `
+            <div class="task-card status-${statusClass}">
+                <div class="task-header">
+                    <h4>${task.task_id}</h4>
+                    <span class="status-badge ${statusBadgeClass}">${task.status}</span>
+                </div>
+                <div class="task-body">
+                    <p><strong>Work Type:</strong> ${task.work_type}</p>
+                    <p><strong>Your Payout:</strong> ${priceDisplay}</p>
+                    <p><strong>Deadline:</strong> ${task.deadline}</p>
+                    <p><strong>Claimed:</strong> ${task.claimed_at ? new Date(task.claimed_at).toLocaleDateString() : 'N/A'}</p>
+                    ${task.notes ? '<p><strong>Notes:</strong> ' + task.notes + '</p>' : ''}
+                    ${task.user_uploaded_files && task.user_uploaded_files.length > 0 ? `
+                        <div style="margin-top: 0.5rem;">
+                            <strong>📎 Reference Files (${task.user_uploaded_files.length}):</strong>
+                            <ul style="margin: 0.5rem 0; padding-left: 1.5rem;">
+                                ${task.user_uploaded_files.map((file, index) => userFileItem(task.task_id, file, index)).join('')}
+                            </ul>
+                        </div>
+                    ` : ''}
+                    ${task.status === 'Completed' || task.status === 'Delivered' ? '<p class="task-completed">✅ Submitted to admin</p>' : '<p class="text-warning">⏳ Submit to admin when complete</p>'}
+                </div>
+                <div class="task-footer">
+                    ${task.status === 'In Progress' || task.status === 'Assigned' ? 
+                        '<button onclick="markComplete(\'' + task.task_id + '\')" class="btn btn-sm btn-success">✅ Mark Complete</button>' : 
+                        (task.status === 'Completed' || task.status === 'Delivered') ? '<span class="badge badge-success">Submitted</span>' : ''}
+                </div>
+                <div class="task-footer">
+                    ${task.writer_paid ? '<span class="badge-success">💰 Paid</span>' : '<span class="badge-warning">💰 Payment Pending</span>'}
+                </div>
+            </div>
+        `;
+    });
+    html += '</div>';
+
+    container.innerHTML = html;
+}
+
+async function claimTask(taskId) {
+    if (!confirm('Are you sure you want to claim this task?')) {
+        return;
+    }
+
+    try {
+        const response = await fetch('/api/writer/claim_task', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ task_id: taskId })
+        });
+
+        const result = await response.json();
+
+        if (response.ok) {
+            alert(result.message);
+            loadAvailableTasks();
+            loadMyTasks();
+        } else {
+            alert('Error: ' + result.error);
+        }
+    } catch (error) {
+        alert('Failed to claim task: ' + error.message);
+    }
+}
+
+document.getElementById('refreshBtn').addEventListener('click', () => {
+    loadAvailableTasks();
+    loadMyTasks();
+});
+
+// Store current task ID for completion
+let currentTaskId = null;
+
+// Mark Complete function
+function markComplete(taskId) {
+    currentTaskId = taskId;
+    // Show modal with admin contact
+    document.getElementById('adminContactModal').style.display = 'block';
+}
+
+// Confirm and mark task as complete
+async function confirmTaskComplete() {
+    if (currentTaskId) {
+        try {
+            const response = await fetch('/api/writer/mark_complete', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({ task_id: currentTaskId })
+            });
+
+            const result = await response.json();
+
+            if (response.ok) {
+                alert('Task marked as complete! Please contact admin to submit your work.');
+                closeAdminModal();
+                // Refresh the tasks to show updated status
+                loadMyTasks();
+                currentTaskId = null;
+            } else {
+                alert('Error: ' + result.error);
+            }
+        } catch (error) {
+            alert('Failed to mark task complete: ' + error.message);
+        }
+    }
+}
+
+// Close modal function
+function closeAdminModal() {
+    document.getElementById('adminContactModal').style.display = 'none';
+    currentTaskId = null;
+}
+
+// Close modal when clicking outside
+window.onclick = function(event) {
+    const modal = document.getElementById('adminContactModal');
+    if (event.target == modal) {
+        modal.style.display = 'none';
+    }
+}
+
+// Initial load
+loadAvailableTasks();
+loadMyTasks();
+
+// Mobile menu toggle
+document.getElementById('mobileMenuToggle').addEventListener('click', function() {
+    const navMenu = document.getElementById('navMenu');
+    navMenu.classList.toggle('active');
+});
+// Close menu when clicking outside
+document.addEventListener('click', function(event) {
+    const navMenu = document.getElementById('navMenu');
+    const menuToggle = document.getElementById('mobileMenuToggle');
+    if (!navMenu.contains(event.target) && !menuToggle.contains(event.target)) {
+        navMenu.classList.remove('active');
+    }
+});
+// Close menu when clicking a link
+document.querySelectorAll('.nav-menu a').forEach(link => {
+    link.addEventListener('click', function() {
+        document.getElementById('navMenu').classList.remove('active');
+    });
+});
@@ -0,0 +1,970 @@
+"""Storage backends for WorkX.
+
+All persistence goes through a Storage object: MongoStorage for MongoDB
+(Atlas / replica sets) and SQLiteStorage for single-node installs. Tasks,
+users, writers and admin accounts are plain dicts in both backends, shaped
+like the MongoDB documents.
+"""
+import heapq
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+
+from pymongo import MongoClient, ASCENDING, DESCENDING, ReplaceOne
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import Primary, PrimaryPreferred, Secondary, SecondaryPreferred, Nearest
+from pymongo.write_concern import WriteConcern
+
+READ_PREFERENCE_MODES = {
+    'primary': Primary,
+    'primaryPreferred': PrimaryPreferred,
+    'secondary': Secondary,
+    'secondaryPreferred': SecondaryPreferred,
+    'nearest': Nearest
+}
+
+# Marks a field that must be absent in compare_and_set_task
+MISSING = object()
+
+
+def strip_file_data(files):
+    """Keep only filename and content type of uploaded files"""
+    files_without_data = []
+    for file_info in files or []:
+        files_without_data.append({
+            'filename': file_info.get('filename') if isinstance(file_info, dict) else file_info,
+            'content_type': file_info.get('content_type') if isinstance(file_info, dict) else None
+        })
+    return files_without_data
+
+
+class Storage(ABC):
+    """Repository interface shared by the storage backends
+
+    filters passed to find_tasks are equality matches (None matches a
+    missing field). Export filters are a dict with optional date_from,
+    date_to (ISO strings, date_to exclusive), statuses, writer_id and
+    after ((created_at, task_id) of the last exported row). Backends must
+    implement every method - a missing one fails when the backend is created.
+    """
+
+    @abstractmethod
+    def ping(self):
+        """Raise if the backend is unreachable"""
+
+    @abstractmethod
+    def causal_session(self):
+        """Context manager: task reads inside it see the task writes made before them on this thread"""
+
+    # Users, writers and admin accounts
+    @abstractmethod
+    def get_user_by_username(self, username):
+        """User account by username, None if there is none"""
+
+    @abstractmethod
+    def get_user_by_id(self, user_id, read_profile=None):
+        """User account by id, None if there is none"""
+
+    @abstractmethod
+    def get_writer_by_username(self, username):
+        """Writer account by username, None if there is none"""
+
+    @abstractmethod
+    def get_writer_by_id(self, writer_id, read_profile=None):
+        """Writer account by id, None if there is none"""
+
+    @abstractmethod
+    def get_admin_by_username(self, username):
+        """Admin account by username, None if there is none"""
+
+    @abstractmethod
+    def create_admin(self, admin_doc):
+        """Add an admin account (there is no signup route for admins)"""
+
+    @abstractmethod
+    def email_exists(self, email):
+        """True if a user or writer already uses email"""
+
+    @abstractmethod
+    def create_user(self, user_doc):
+        """Insert a user account, return its id"""
+
+    @abstractmethod
+    def create_writer(self, writer_doc):
+        """Insert a writer account, return its id"""
+
+    @abstractmethod
+    def iter_writers(self):
+        """Yield every writer account"""
+
+    @abstractmethod
+    def inc_writer_counters(self, writer_id, changes):
+        """Atomically add changes (field -> delta) to the writer's counters"""
+
+    # Tasks
+    @abstractmethod
+    def get_task(self, task_id, include_archived=True):
+        """Task by ID from the primary copy, falling back to archived tasks"""
+
+    @abstractmethod
+    def find_tasks(self, filters, include_archived=False, read_profile=None):
+        """Tasks matching filters, newest first"""
+
+    @abstractmethod
+    def insert_task(self, task):
+        """Insert a new task"""
+
+    @abstractmethod
+    def update_task(self, task_id, fields):
+        """Set fields on a task (archived tasks are updated in place), return False if not found"""
+
+    @abstractmethod
+    def compare_and_set_task(self, task_id, expected, fields=None, unset=()):
+        """Update the task only if it still has the expected field values, return True if it did"""
+
+    # Upload payloads
+    @abstractmethod
+    def save_task_files(self, task_id, file_docs):
+        """Store upload payload documents (task_id, index, data, expires_at, ...)"""
+
+    @abstractmethod
+    def get_task_file_data(self, task_id, file_index):
+        """Base64 payload, None if it has expired or been removed"""
+
+    @abstractmethod
+    def extend_task_files(self, task_id, expires_at):
+        """Move the expiry of a task's unexpired payloads out to expires_at if that is later"""
+
+    @abstractmethod
+    def has_task_file_data(self, task_id, file_index):
+        """Whether a payload is still stored, without reading it"""
+
+    @abstractmethod
+    def delete_task_files(self, task_ids):
+        """Remove payloads of the given tasks together with their image variants"""
+
+    @abstractmethod
+    def replace_task_file_data(self, task_id, file_index, data):
+        """Swap a stored payload for a recompressed one, keeping its expiry"""
+
+    @abstractmethod
+    def save_task_file_variants(self, task_id, file_index, variants):
+        """Store image previews ({name: bytes}) next to an upload payload; they expire with it"""
+
+    @abstractmethod
+    def get_task_file_variant(self, task_id, file_index, name):
+        """Bytes of a stored image preview, None if it hasn't been generated or has expired"""
+
+    # Lifecycle
+    @abstractmethod
+    def archive_tasks(self, statuses, cutoff, batch_size):
+        """Move tasks with a status in statuses finished before cutoff to the archive, return count"""
+
+    # Ledger
+    @abstractmethod
+    def insert_ledger_entry(self, entry):
+        """Append an entry to the writer ledger"""
+
+    @abstractmethod
+    def settle_writer_tasks(self, writer_id, task_ids, statuses, batch_id, paid_at):
+        """Mark the writer's unpaid tasks paid in bulk, return [(task_id, amount)]
+
+        Settles task_ids if given, otherwise all tasks with a status in statuses.
+        """
+
+    @abstractmethod
+    def backfill_ledger_stamps(self, statuses):
+        """Stamp ledger_earning/ledger_payout on tasks completed or paid before the ledger existed"""
+
+    @abstractmethod
+    def writer_task_totals(self, statuses):
+        """{writer_id: {'completed_tasks', 'earnings', 'paid_out'}} computed from tasks"""
+
+    # Export
+    @abstractmethod
+    def iter_export_rows(self, export_filters, fields):
+        """Yield tasks (archived included) in (created_at, task_id) order without loading them all"""
+
+
+class MongoStorage(Storage):
+    """MongoDB backend - tasks, tasks_archive, task_files, users, writers, admin and ledger collections"""
+
+    def __init__(self, uri, max_pool_size=1, read_preferences=None, max_staleness=90):
+        self._client = MongoClient(
+            uri,
+            serverSelectionTimeoutMS=5000,
+            connectTimeoutMS=5000,
+            socketTimeoutMS=5000,
+            maxPoolSize=max_pool_size,
+            minPoolSize=0
+        )
+        self.db = self._client.get_database()
+        self._client.admin.command('ping')
+        self._read_preferences = read_preferences or {}
+        self._max_staleness = max_staleness
+        self._read_dbs = {}
+        self._local = threading.local()
+        self.ensure_indexes()
+
+    def ensure_indexes(self):
+        """Create indexes used by dashboard queries and the task lifecycle"""
+        db = self.db
+        try:
+            db.tasks.create_index('task_id')
+            db.tasks.create_index([('user_id', ASCENDING), ('created_at', DESCENDING)])
+            db.tasks.create_index([('writer_id', ASCENDING), ('created_at', DESCENDING)])
+            db.tasks.create_index([('status', ASCENDING), ('created_at', DESCENDING)])
+            db.tasks_archive.create_index('task_id', unique=True)
+            # Exports walk tasks in (created_at, task_id) order
+            db.tasks.create_index([('created_at', ASCENDING), ('task_id', ASCENDING)])
+            db.tasks_archive.create_index([('created_at', ASCENDING), ('task_id', ASCENDING)])
+            db.tasks_archive.create_index([('user_id', ASCENDING), ('created_at', DESCENDING)])
+            db.tasks_archive.create_index([('writer_id', ASCENDING), ('created_at', DESCENDING)])
+            # Upload payloads live in their own collection so MongoDB can expire them
+            db.task_files.create_index([('task_id', ASCENDING), ('index', ASCENDING)])
+            db.task_files.create_index('expires_at', expireAfterSeconds=0)
+            # Writer earnings ledger
+            db.ledger.create_index([('writer_id', ASCENDING), ('created_at', DESCENDING)])
+            db.tasks.create_index('payout_batch_id', sparse=True)
+            db.tasks_archive.create_index('payout_batch_id', sparse=True)
+        except Exception as e:
+            # Index creation is best effort - the app keeps working without them
+            print(f"MongoDB index creation error: {e}")
+
+    def read_db(self, read_profile=None):
+        """Database handle using the read preference configured for read_profile (primary if None)"""
+        mode = self._read_preferences.get(read_profile, 'primary') if read_profile else 'primary'
+        if mode == 'primary':
+            return self.db
+        if mode not in self._read_dbs:
+            if mode not in READ_PREFERENCE_MODES:
+                raise ValueError(f"Unknown read preference: {mode}")
+            read_preference = READ_PREFERENCE_MODES[mode](max_staleness=self._max_staleness)
+            self._read_dbs[mode] = self.db.with_options(read_preference=read_preference)
+        return self._read_dbs[mode]
+
+    @contextmanager
+    def causal_session(self):
+        """Causally consistent session for writes followed by reads of the same data
+
+        Task writes and get_task calls made inside it on this thread share
+        the session; nested calls reuse the outer one.
+        """
+        current = getattr(self._local, 'session', None)
+        if current is not None:
+            yield current
+            return
+        with self._client.start_session(causal_consistency=True) as session:
+            self._local.session = session
+            try:
+                yield session
+            finally:
+                self._local.session = None
+
+    def primary_collection(self, name):
+        """Collection with majority read/write concern on the primary, for use in causal sessions"""
+        return self.db.get_collection(
+            name,
+            read_preference=Primary(),
+            read_concern=ReadConcern('majority'),
+            write_concern=WriteConcern('majority')
+        )
+
+    @staticmethod
+    def _clean(doc):
+        # Convert ObjectId to string for JSON serialization
+        if doc and '_id' in doc:
+            doc['_id'] = str(doc['_id'])
+        return doc
+
+    def ping(self):
+        self.db.command('ping')
+
+    def _get_account(self, collection, query):
+        account = self._clean(collection.find_one(query))
+        if account:
+            account['id'] = account.get('id', account['_id'])
+        return account
+
+    def get_user_by_username(self, username):
+        return self._get_account(self.db.users, {'username': username})
+
+    def get_user_by_id(self, user_id, read_profile=None):
+        return self._get_account(self.read_db(read_profile).users, {'id': user_id})
+
+    def get_writer_by_username(self, username):
+        return self._get_account(self.db.writers, {'username': username})
+
+    def get_writer_by_id(self, writer_id, read_profile=None):
+        return self._get_account(self.read_db(read_profile).writers, {'id': writer_id})
+
+    def get_admin_by_username(self, username):
+        return self._clean(self.db.admin.find_one({'username': username}))
+
+    def create_admin(self, admin_doc):
+        self.db.admin.insert_one(admin_doc)
+
+    def email_exists(self, email):
+        return bool(self.db.users.find_one({'email': email}, {'_id': 1})
+                    or self.db.writers.find_one({'email': email}, {'_id': 1}))
+
+    def create_user(self, user_doc):
+        return self.db.users.insert_one(user_doc).inserted_id
+
+    def create_writer(self, writer_doc):
+        return self.db.writers.insert_one(writer_doc).inserted_id
+
+    def iter_writers(self):
+        for writer in self.db.writers.find():
+            yield self._clean(writer)
+
+    def inc_writer_counters(self, writer_id, changes):
+        self.db.writers.update_one({'id': writer_id}, {'$inc': changes})
+
+    def get_task(self, task_id, include_archived=True):
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            task = self.db.tasks.find_one({'task_id': task_id})
+            if not task and include_archived:
+                task = self.db.tasks_archive.find_one({'task_id': task_id})
+            return self._clean(task)
+        # Inside a causal session, read from the primary after the session's writes
+        task = self.primary_collection('tasks').find_one({'task_id': task_id}, session=session)
+        if not task and include_archived:
+            task = self.primary_collection('tasks_archive').find_one({'task_id': task_id}, session=session)
+        return self._clean(task)
+
+    def find_tasks(self, filters, include_archived=False, read_profile=None):
+        db = self.read_db(read_profile)
+        tasks = list(db.tasks.find(filters).sort('created_at', -1))
+        if include_archived:
+            tasks.extend(db.tasks_archive.find(filters).sort('created_at', -1))
+            tasks.sort(key=lambda t: t.get('created_at') or '', reverse=True)
+        return [self._clean(task) for task in tasks]
+
+    def insert_task(self, task):
+        self.db.tasks.insert_one(task)
+        self._clean(task)
+
+    def update_task(self, task_id, fields):
+        with self.causal_session() as session:
+            for name in ('tasks', 'tasks_archive'):
+                result = self.primary_collection(name).update_one(
+                    {'task_id': task_id}, {'$set': fields}, session=session
+                )
+                if result.matched_count:
+                    return True
+        return False
+
+    def compare_and_set_task(self, task_id, expected, fields=None, unset=()):
+        query = {'task_id': task_id}
+        for field, value in expected.items():
+            query[field] = {'$exists': False} if value is MISSING else value
+        update = {}
+        if fields:
+            update['$set'] = fields
+        if unset:
+            update['$unset'] = {field: '' for field in unset}
+        with self.causal_session() as session:
+            for name in ('tasks', 'tasks_archive'):
+                result = self.primary_collection(name).update_one(query, update, session=session)
+                if result.modified_count:
+                    return True
+        return False
+
+    def save_task_files(self, task_id, file_docs):
+        if file_docs:
+            self.db.task_files.insert_many(file_docs)
+
+    def get_task_file_data(self, task_id, file_index):
+        file_doc = self.db.task_files.find_one({'task_id': task_id, 'index': file_index}, {'data': 1})
+        return file_doc['data'] if file_doc else None
+
+    def extend_task_files(self, task_id, expires_at):
+        self.db.task_files.update_many(
+            {'task_id': task_id, 'expires_at': {'$gt': datetime.now(timezone.utc), '$lt': expires_at}},
+            {'$set': {'expires_at': expires_at}}
+        )
+
+    def has_task_file_data(self, task_id, file_index):
+        return self.db.task_files.find_one({'task_id': task_id, 'index': file_index}, {'_id': 1}) is not None
+
+    def delete_task_files(self, task_ids):
+        self.db.task_files.delete_many({'task_id': {'$in': list(task_ids)}})
+
+    def replace_task_file_data(self, task_id, file_index, data):
+        self.db.task_files.update_one({'task_id': task_id, 'index': file_index}, {'$set': {'data': data}})
+
+    def save_task_file_variants(self, task_id, file_index, variants):
+        self.db.task_files.update_one(
+            {'task_id': task_id, 'index': file_index},
+            {'$set': {f'variants.{name}': data for name, data in variants.items()}}
+        )
+
+    def get_task_file_variant(self, task_id, file_index, name):
+        file_doc = self.db.task_files.find_one({'task_id': task_id, 'index': file_index}, {f'variants.{name}': 1})
+        return (file_doc or {}).get('variants', {}).get(name)
+
+    def archive_tasks(self, statuses, cutoff, batch_size):
+        db = self.db
+        query = {
+            'status': {'$in': statuses},
+            '$or': [
+                {'completed_at': {'$lt': cutoff}},
+                {'completed_at': {'$exists': False}, 'created_at': {'$lt': cutoff}}
+            ]
+        }
+
+        archived = 0
+        while True:
+            batch = list(db.tasks.find(query).limit(batch_size))
+            if not batch:
+                break
+
+            now = datetime.now().isoformat()
+            operations = []
+            for task in batch:
+                task['user_uploaded_files'] = strip_file_data(task.get('user_uploaded_files'))
+                task['archived_at'] = now
+                # Upsert keeps the job idempotent if a previous run stopped before deleting
+                operations.append(ReplaceOne({'task_id': task['task_id']}, task, upsert=True))
+            db.tasks_archive.bulk_write(operations, ordered=False)
+
+            db.tasks.delete_many({'_id': {'$in': [task['_id'] for task in batch]}})
+            self.delete_task_files(task['task_id'] for task in batch)
+            archived += len(batch)
+
+            if len(batch) < batch_size:
+                break
+
+        return archived
+
+    def insert_ledger_entry(self, entry):
+        self.db.ledger.insert_one(entry)
+        self._clean(entry)
+
+    def settle_writer_tasks(self, writer_id, task_ids, statuses, batch_id, paid_at):
+        query = {'writer_id': writer_id, 'writer_paid': {'$ne': True}}
+        if task_ids is None:
+            query['status'] = {'$in': statuses}
+        else:
+            query['task_id'] = {'$in': task_ids}
+
+        settle = [{'$set': {
+            'writer_paid': True,
+            'paid_at': paid_at,
+            'payout_batch_id': batch_id,
+            'ledger_payout': {'$ifNull': ['$worker_payout', 0]},
+            'ledger_payout_writer_id': writer_id
+        }}]
+        settled = []
+        with self.causal_session() as session:
+            for name in ('tasks', 'tasks_archive'):
+                collection = self.primary_collection(name)
+                collection.update_many(query, settle, session=session)
+                for task in collection.find({'payout_batch_id': batch_id}, {'task_id': 1, 'ledger_payout': 1}, session=session):
+                    settled.append((task['task_id'], task['ledger_payout']))
+        return settled
+
+    def backfill_ledger_stamps(self, statuses):
+        for collection in (self.db.tasks, self.db.tasks_archive):
+            collection.update_many(
+                {'status': {'$in': statuses}, 'writer_id': {'$ne': None}, 'ledger_earning': {'$exists': False}},
+                [{'$set': {'ledger_earning': {'$ifNull': ['$worker_payout', 0]}, 'ledger_writer_id': '$writer_id'}}]
+            )
+            collection.update_many(
+                {'writer_paid': True, 'writer_id': {'$ne': None}, 'ledger_payout': {'$exists': False}},
+                [{'$set': {'ledger_payout': {'$ifNull': ['$worker_payout', 0]}, 'ledger_payout_writer_id': '$writer_id'}}]
+            )
+
+    def writer_task_totals(self, statuses):
+        completed = {'$in': ['$status', statuses]}
+        pipeline = [
+            {'$match': {'writer_id': {'$ne': None}}},
+            {'$group': {
+                '_id': '$writer_id',
+                'completed_tasks': {'$sum': {'$cond': [completed, 1, 0]}},
+                'earnings': {'$sum': {'$cond': [completed, {'$ifNull': ['$ledger_earning', {'$ifNull': ['$worker_payout', 0]}]}, 0]}}
+            }}
+        ]
+        # Payouts count for the writer who was paid, even if the task has since moved on
+        payout_pipeline = [
+            {'$match': {'writer_paid': True}},
+            {'$group': {
+                '_id': {'$ifNull': ['$ledger_payout_writer_id', '$writer_id']},
+                'paid_out': {'$sum': {'$ifNull': ['$ledger_payout', {'$ifNull': ['$worker_payout', 0]}]}}
+            }}
+        ]
+        totals = {}
+        for collection in (self.db.tasks, self.db.tasks_archive):
+            for rows in (collection.aggregate(pipeline), collection.aggregate(payout_pipeline)):
+                for row in rows:
+                    if row['_id'] is None:
+                        continue
+                    writer_totals = totals.setdefault(row['_id'], {'completed_tasks': 0, 'earnings': 0.0, 'paid_out': 0.0})
+                    for field in writer_totals:
+                        writer_totals[field] += row.get(field, 0)
+        return totals
+
+    def iter_export_rows(self, export_filters, fields):
+        query = {}
+        created_at = {}
+        if export_filters.get('date_from'):
+            created_at['$gte'] = export_filters['date_from']
+        if export_filters.get('date_to'):
+            created_at['$lt'] = export_filters['date_to']
+        if created_at:
+            query['created_at'] = created_at
+        if export_filters.get('statuses'):
+            query['status'] = {'$in': export_filters['statuses']}
+        if export_filters.get('writer_id'):
+            query['writer_id'] = export_filters['writer_id']
+        if export_filters.get('after'):
+            after_created_at, after_task_id = export_filters['after']
+            query = {'$and': [query, {'$or': [
+                {'created_at': {'$gt': after_created_at}},
+                {'created_at': after_created_at, 'task_id': {'$gt': after_task_id}}
+            ]}]}
+
+        db = self.read_db('export')
+        projection = {field: 1 for field in fields}
+        projection['_id'] = 0
+        cursors = [
+            collection.find(query, projection).sort([('created_at', ASCENDING), ('task_id', ASCENDING)]).batch_size(500)
+            for collection in (db.tasks, db.tasks_archive)
+        ]
+        return heapq.merge(*cursors, key=lambda row: (row.get('created_at') or '', row.get('task_id') or ''))
+
+
+class SQLiteStorage(Storage):
+    """Embedded SQLite backend for single-node installs and local development
+
+    Each task/account is stored as a JSON document next to indexed columns
+    for the fields queries filter and sort on. Connections are per thread,
+    run in WAL mode so readers never block the writer, and always use
+    parameterized statements, which sqlite3 keeps prepared in its
+    per-connection statement cache.
+    """
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS tasks (
+        task_id TEXT PRIMARY KEY,
+        archived INTEGER NOT NULL DEFAULT 0,
+        user_id TEXT,
+        writer_id TEXT,
+        status TEXT,
+        created_at TEXT,
+        completed_at TEXT,
+        payout_batch_id TEXT,
+        doc TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS tasks_user ON tasks (user_id, created_at);
+    CREATE INDEX IF NOT EXISTS tasks_writer ON tasks (writer_id, created_at);
+    CREATE INDEX IF NOT EXISTS tasks_status ON tasks (archived, status, created_at);
+    CREATE INDEX IF NOT EXISTS tasks_created ON tasks (created_at, task_id);
+    CREATE INDEX IF NOT EXISTS tasks_payout_batch ON tasks (payout_batch_id) WHERE payout_batch_id IS NOT NULL;
+
+    CREATE TABLE IF NOT EXISTS task_files (
+        task_id TEXT NOT NULL,
+        file_index INTEGER NOT NULL,
+        expires_at TEXT NOT NULL,
+        data TEXT NOT NULL,
+        PRIMARY KEY (task_id, file_index)
+    );
+    CREATE INDEX IF NOT EXISTS task_files_expiry ON task_files (expires_at);
+
+    CREATE TABLE IF NOT EXISTS task_file_variants (
+        task_id TEXT NOT NULL,
+        file_index INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        data BLOB NOT NULL,
+        PRIMARY KEY (task_id, file_index, name)
+    );
+
+    CREATE TABLE IF NOT EXISTS users (
+        id TEXT PRIMARY KEY,
+        username TEXT UNIQUE NOT NULL,
+        email TEXT,
+        doc TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS users_email ON users (email);
+
+    CREATE TABLE IF NOT EXISTS writers (
+        id TEXT PRIMARY KEY,
+        username TEXT UNIQUE NOT NULL,
+        email TEXT,
+        doc TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS writers_email ON writers (email);
+
+    CREATE TABLE IF NOT EXISTS admin (
+        username TEXT PRIMARY KEY,
+        doc TEXT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS ledger (
+        entry_id TEXT PRIMARY KEY,
+        writer_id TEXT,
+        created_at TEXT,
+        doc TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS ledger_writer ON ledger (writer_id, created_at);
+    """
+    TASK_COLUMNS = ('user_id', 'writer_id', 'status', 'created_at', 'completed_at', 'payout_batch_id')
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._connection().executescript(self.SCHEMA)
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit mode; writes that must be atomic use _transaction()
+            conn = sqlite3.connect(self.path, isolation_level=None, timeout=10, cached_statements=256)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._connection()
+        # IMMEDIATE takes the write lock up front so read-modify-write can't interleave
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    @staticmethod
+    def _load(row):
+        return json.loads(row[0]) if row else None
+
+    def _write_task(self, conn, task, archived):
+        conn.execute(
+            'INSERT OR REPLACE INTO tasks (task_id, archived, user_id, writer_id, status, created_at, '
+            'completed_at, payout_batch_id, doc) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+            (task['task_id'], int(archived)) + tuple(task.get(column) for column in self.TASK_COLUMNS)
+            + (json.dumps(task, default=str),)
+        )
+
+    def _read_task(self, conn, task_id):
+        row = conn.execute('SELECT doc, archived FROM tasks WHERE task_id = ?', (task_id,)).fetchone()
+        return (json.loads(row[0]), bool(row[1])) if row else (None, False)
+
+    def ping(self):
+        self._connection().execute('SELECT 1')
+
+    def causal_session(self):
+        """A single SQLite file always reads its own writes"""
+        return nullcontext()
+
+    def _get_account(self, table, column, value):
+        row = self._connection().execute(f'SELECT doc FROM {table} WHERE {column} = ?', (value,)).fetchone()
+        return self._load(row)
+
+    def get_user_by_username(self, username):
+        return self._get_account('users', 'username', username)
+
+    def get_user_by_id(self, user_id, read_profile=None):
+        return self._get_account('users', 'id', user_id)
+
+    def get_writer_by_username(self, username):
+        return self._get_account('writers', 'username', username)
+
+    def get_writer_by_id(self, writer_id, read_profile=None):
+        return self._get_account('writers', 'id', writer_id)
+
+    def get_admin_by_username(self, username):
+        return self._get_account('admin', 'username', username)
+
+    def create_admin(self, admin_doc):
+        self._connection().execute(
+            'INSERT INTO admin (username, doc) VALUES (?, ?)', (admin_doc['username'], json.dumps(admin_doc))
+        )
+
+    def email_exists(self, email):
+        conn = self._connection()
+        return bool(conn.execute('SELECT 1 FROM users WHERE email = ?', (email,)).fetchone()
+                    or conn.execute('SELECT 1 FROM writers WHERE email = ?', (email,)).fetchone())
+
+    def create_user(self, user_doc):
+        self._connection().execute(
+            'INSERT INTO users (id, username, email, doc) VALUES (?, ?, ?, ?)',
+            (user_doc['id'], user_doc['username'], user_doc['email'], json.dumps(user_doc))
+        )
+        return user_doc['id']
+
+    def create_writer(self, writer_doc):
+        self._connection().execute(
+            'INSERT INTO writers (id, username, email, doc) VALUES (?, ?, ?, ?)',
+            (writer_doc['id'], writer_doc['username'], writer_doc['email'], json.dumps(writer_doc))
+        )
+        return writer_doc['id']
+
+    def iter_writers(self):
+        for row in self._connection().execute('SELECT doc FROM writers'):
+            yield json.loads(row[0])
+
+    def inc_writer_counters(self, writer_id, changes):
+        with self._transaction() as conn:
+            writer = self._load(conn.execute('SELECT doc FROM writers WHERE id = ?', (writer_id,)).fetchone())
+            if writer is None:
+                return
+            for field, delta in changes.items():
+                writer[field] = writer.get(field, 0) + delta
+            conn.execute('UPDATE writers SET doc = ? WHERE id = ?', (json.dumps(writer), writer_id))
+
+    def get_task(self, task_id, include_archived=True):
+        task, archived = self._read_task(self._connection(), task_id)
+        if archived and not include_archived:
+            return None
+        return task
+
+    def find_tasks(self, filters, include_archived=False, read_profile=None):
+        clauses = [] if include_archived else ['archived = 0']
+        params = []
+        extra_filters = {}
+        for field, value in filters.items():
+            if field in self.TASK_COLUMNS or field == 'task_id':
+                if value is None:
+                    clauses.append(f'{field} IS NULL')
+                else:
+                    clauses.append(f'{field} = ?')
+                    params.append(value)
+            else:
+                extra_filters[field] = value
+        sql = 'SELECT doc FROM tasks'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY created_at DESC'
+        tasks = [json.loads(row[0]) for row in self._connection().execute(sql, params)]
+        if extra_filters:
+            tasks = [task for task in tasks
+                     if all(task.get(field) == value for field, value in extra_filters.items())]
+        return tasks
+
+    def insert_task(self, task):
+        with self._transaction() as conn:
+            self._write_task(conn, task, archived=False)
+
+    def update_task(self, task_id, fields):
+        with self._transaction() as conn:
+            task, archived = self._read_task(conn, task_id)
+            if task is None:
+                return False
+            task.update(fields)
+            self._write_task(conn, task, archived)
+            return True
+
+    def compare_and_set_task(self, task_id, expected, fields=None, unset=()):
+        with self._transaction() as conn:
+            task, archived = self._read_task(conn, task_id)
+            if task is None:
+                return False
+            for field, value in expected.items():
+                if value is MISSING:
+                    if field in task:
+                        return False
+                elif task.get(field) != value:
+                    return False
+            task.update(fields or {})
+            for field in unset:
+                task.pop(field, None)
+            self._write_task(conn, task, archived)
+            return True
+
+    def save_task_files(self, task_id, file_docs):
+        self._connection().executemany(
+            'INSERT OR REPLACE INTO task_files (task_id, file_index, expires_at, data) VALUES (?, ?, ?, ?)',
+            [(doc['task_id'], doc['index'], doc['expires_at'].isoformat(), doc['data']) for doc in file_docs]
+        )
+
+    def get_task_file_data(self, task_id, file_index):
+        row = self._connection().execute(
+            'SELECT data FROM task_files WHERE task_id = ? AND file_index = ? AND expires_at > ?',
+            (task_id, file_index, datetime.now(timezone.utc).isoformat())
+        ).fetchone()
+        return row[0] if row else None
+
+    def extend_task_files(self, task_id, expires_at):
+        self._connection().execute(
+            'UPDATE task_files SET expires_at = ? WHERE task_id = ? AND expires_at > ? AND expires_at < ?',
+            (expires_at.isoformat(), task_id, datetime.now(timezone.utc).isoformat(), expires_at.isoformat())
+        )
+
+    def has_task_file_data(self, task_id, file_index):
+        row = self._connection().execute(
+            'SELECT 1 FROM task_files WHERE task_id = ? AND file_index = ? AND expires_at > ?',
+            (task_id, file_index, datetime.now(timezone.utc).isoformat())
+        ).fetchone()
+        return row is not None
+
+    def delete_task_files(self, task_ids):
+        params = [(task_id,) for task_id in task_ids]
+        with self._transaction() as conn:
+            conn.executemany('DELETE FROM task_files WHERE task_id = ?', params)
+            conn.executemany('DELETE FROM task_file_variants WHERE task_id = ?', params)
+
+    def replace_task_file_data(self, task_id, file_index, data):
+        self._connection().execute(
+            'UPDATE task_files SET data = ? WHERE task_id = ? AND file_index = ?', (data, task_id, file_index)
+        )
+
+    def save_task_file_variants(self, task_id, file_index, variants):
+        self._connection().executemany(
+            'INSERT OR REPLACE INTO task_file_variants (task_id, file_index, name, data) VALUES (?, ?, ?, ?)',
+            [(task_id, file_index, name, data) for name, data in variants.items()]
+        )
+
+    def get_task_file_variant(self, task_id, file_index, name):
+        row = self._connection().execute(
+            'SELECT v.data FROM task_file_variants v JOIN task_files f USING (task_id, file_index) '
+            'WHERE v.task_id = ? AND v.file_index = ? AND v.name = ? AND f.expires_at > ?',
+            (task_id, file_index, name, datetime.now(timezone.utc).isoformat())
+        ).fetchone()
+        return row[0] if row else None
+
+    def purge_expired_files(self):
+        """SQLite has no TTL indexes, so expired payloads are deleted by the archive job"""
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM task_files WHERE expires_at <= ?', (datetime.now(timezone.utc).isoformat(),))
+            conn.execute('DELETE FROM task_file_variants WHERE NOT EXISTS (SELECT 1 FROM task_files f '
+                         'WHERE f.task_id = task_file_variants.task_id AND f.file_index = task_file_variants.file_index)')
+
+    def archive_tasks(self, statuses, cutoff, batch_size):
+        placeholders = ','.join('?' * len(statuses))
+        archived = 0
+        while True:
+            with self._transaction() as conn:
+                rows = conn.execute(
+                    f'SELECT doc FROM tasks WHERE archived = 0 AND status IN ({placeholders}) '
+                    f'AND COALESCE(completed_at, created_at) < ? LIMIT ?',
+                    (*statuses, cutoff, batch_size)
+                ).fetchall()
+                now = datetime.now().isoformat()
+                for row in rows:
+                    task = json.loads(row[0])
+                    task['user_uploaded_files'] = strip_file_data(task.get('user_uploaded_files'))
+                    task['archived_at'] = now
+                    self._write_task(conn, task, archived=True)
+                    conn.execute('DELETE FROM task_files WHERE task_id = ?', (task['task_id'],))
+                    conn.execute('DELETE FROM task_file_variants WHERE task_id = ?', (task['task_id'],))
+            archived += len(rows)
+            if len(rows) < batch_size:
+                break
+        self.purge_expired_files()
+        return archived
+
+    def insert_ledger_entry(self, entry):
+        self._connection().execute(
+            'INSERT INTO ledger (entry_id, writer_id, created_at, doc) VALUES (?, ?, ?, ?)',
+            (entry['entry_id'], entry['writer_id'], entry['created_at'], json.dumps(entry))
+        )
+
+    def settle_writer_tasks(self, writer_id, task_ids, statuses, batch_id, paid_at):
+        if task_ids is None:
+            condition = f"status IN ({','.join('?' * len(statuses))})"
+            params = list(statuses)
+        else:
+            condition = f"task_id IN ({','.join('?' * len(task_ids))})"
+            params = list(task_ids)
+        settled = []
+        with self._transaction() as conn:
+            rows = conn.execute(
+                f'SELECT doc, archived FROM tasks WHERE writer_id = ? AND {condition}', [writer_id] + params
+            ).fetchall()
+            for doc, archived in rows:
+                task = json.loads(doc)
+                if task.get('writer_paid') is True:
+                    continue
+                task.update({
+                    'writer_paid': True,
+                    'paid_at': paid_at,
+                    'payout_batch_id': batch_id,
+                    'ledger_payout': task.get('worker_payout') or 0,
+                    'ledger_payout_writer_id': writer_id
+                })
+                self._write_task(conn, task, archived)
+                settled.append((task['task_id'], task['ledger_payout']))
+        return settled
+
+    def backfill_ledger_stamps(self, statuses):
+        with self._transaction() as conn:
+            rows = conn.execute('SELECT doc, archived FROM tasks WHERE writer_id IS NOT NULL').fetchall()
+            for doc, archived in rows:
+                task = json.loads(doc)
+                changed = False
+                if task.get('status') in statuses and 'ledger_earning' not in task:
+                    task['ledger_earning'] = task.get('worker_payout') or 0
+                    task['ledger_writer_id'] = task['writer_id']
+                    changed = True
+                if task.get('writer_paid') is True and 'ledger_payout' not in task:
+                    task['ledger_payout'] = task.get('worker_payout') or 0
+                    task['ledger_payout_writer_id'] = task['writer_id']
+                    changed = True
+                if changed:
+                    self._write_task(conn, task, archived)
+
+    def writer_task_totals(self, statuses):
+        placeholders = ','.join('?' * len(statuses))
+        rows = self._connection().execute(
+            # Payouts count for the writer who was paid, even if the task has since moved on
+            f"""SELECT credited_writer_id, SUM(completed), SUM(earnings), SUM(paid_out) FROM (
+                SELECT writer_id AS credited_writer_id,
+                    CASE WHEN status IN ({placeholders}) THEN 1 ELSE 0 END AS completed,
+                    CASE WHEN status IN ({placeholders})
+                        THEN COALESCE(json_extract(doc, '$.ledger_earning'), json_extract(doc, '$.worker_payout'), 0)
+                        ELSE 0 END AS earnings,
+                    0 AS paid_out
+                FROM tasks WHERE writer_id IS NOT NULL
+                UNION ALL
+                SELECT COALESCE(json_extract(doc, '$.ledger_payout_writer_id'), writer_id), 0, 0,
+                    COALESCE(json_extract(doc, '$.ledger_payout'), json_extract(doc, '$.worker_payout'), 0)
+                FROM tasks WHERE json_extract(doc, '$.writer_paid') = 1
+            ) WHERE credited_writer_id IS NOT NULL GROUP BY credited_writer_id""",
+            (*statuses, *statuses)
+        )
+        return {
+            writer_id: {'completed_tasks': completed, 'earnings': float(earnings), 'paid_out': float(paid_out)}
+            for writer_id, completed, earnings, paid_out in rows
+        }
+
+    def iter_export_rows(self, export_filters, fields):
+        clauses = []
+        params = []
+        if export_filters.get('date_from'):
+            clauses.append('created_at >= ?')
+            params.append(export_filters['date_from'])
+        if export_filters.get('date_to'):
+            clauses.append('created_at < ?')
+            params.append(export_filters['date_to'])
+        if export_filters.get('statuses'):
+            clauses.append(f"status IN ({','.join('?' * len(export_filters['statuses']))})")
+            params.extend(export_filters['statuses'])
+        if export_filters.get('writer_id'):
+            clauses.append('writer_id = ?')
+            params.append(export_filters['writer_id'])
+        if export_filters.get('after'):
+            clauses.append('(created_at > ? OR (created_at = ? AND task_id > ?))')
+            after_created_at, after_task_id = export_filters['after']
+            params.extend([after_created_at, after_created_at, after_task_id])
+        sql = 'SELECT doc FROM tasks'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY created_at, task_id'
+        # A dedicated connection keeps the long-running read cursor off the shared one
+        conn = sqlite3.connect(self.path, timeout=10)
+        try:
+            for row in conn.execute(sql, params):
+                task = json.loads(row[0])
+                yield {field: task.get(field) for field in fields}
+        finally:
+            conn.close()
+